@@ -2,7 +2,7 @@ import base64
 import streamlit as st
 import pandas as pd
 from curl_cffi import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import time
 import re
 import json
@@ -11,6 +11,13 @@ import queue
 import hashlib
 from supabase import create_client, Client
 
+# Optional: lxml is a much faster BeautifulSoup backend
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 if 'processed_data' in st.session_state:
     pass
 st.cache_data.clear()
@@ -747,7 +754,8 @@ def get_amazon_product_details(asin, log_queue, processing_id, total_count):
             if resp.status_code == 200:
                 log_queue.put(('success', f'ASIN {asin}: Retrieved page on attempt {attempt+1}'))
                 
-                soup = BeautifulSoup(resp.text, 'html.parser')
+                # Only the main product image is needed from the (very large) product page
+                soup = BeautifulSoup(resp.text, HTML_PARSER, parse_only=SoupStrainer("img", id="landingImage"))
                 
                 img_tag = soup.find("img", {"id": "landingImage"})
                 if img_tag and img_tag.get("data-a-dynamic-image"):
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import io
+import os
 from datetime import datetime
-from scraper import AuctionScraper
+from scraper import AuctionScraper, BROWSER_SERVICE, AI_PRIORITIES
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -144,6 +145,13 @@ if 'results_df' not in st.session_state:
     st.session_state.results_df = pd.DataFrame()
 if 'scraper_instance' not in st.session_state:
     st.session_state.scraper_instance = None
+if 'run_stats' not in st.session_state:
+    st.session_state.run_stats = {}
+if 'unpriced_df' not in st.session_state:
+    st.session_state.unpriced_df = pd.DataFrame()
+
+# Keep a headless Chrome warm between reruns so browser-based scrapes start immediately
+BROWSER_SERVICE.warm(1)
 
 # --- Helper Functions ---
 def to_excel(df: pd.DataFrame, site_name: str):
@@ -200,6 +208,18 @@ def display_results(site_name):
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             use_container_width=True
         )
+    
+    if not st.session_state.unpriced_df.empty:
+        with st.expander(f"❔ Unpriced Lots ({len(st.session_state.unpriced_df)})"):
+            st.dataframe(st.session_state.unpriced_df, use_container_width=True, hide_index=True)
+    
+    if st.session_state.run_stats:
+        with st.expander("⏱️ Run Stats"):
+            stats_df = pd.DataFrame(
+                [(metric, str(value)) for metric, value in st.session_state.run_stats.items()],
+                columns=['Metric', 'Value']
+            )
+            st.dataframe(stats_df, use_container_width=True, hide_index=True)
 
 # --- UI Layout ---
 
@@ -250,6 +270,55 @@ with st.sidebar:
     
     st.session_state.api_keys = keys
     
+    st.markdown("---")
+    st.header("⚡ Performance")
+    st.session_state.scraper_settings = {
+        'max_workers_per_host': st.number_input(
+            "Parallel requests per site", min_value=1, max_value=32, value=8, step=1,
+            help="How many lot pages are fetched at once from the same auction site (Nellis, BidFTA)"
+        ),
+        'parse_processes': st.number_input(
+            "Parser processes", min_value=0, max_value=os.cpu_count() or 1, value=0, step=1,
+            help="Parse lot pages (Nellis, BidFTA, BiddingKings) in separate processes so parsing scales with CPU cores; 0 parses in the download threads"
+        ),
+        'page_window': st.number_input(
+            "Listing pages fetched in parallel", min_value=1, max_value=16, value=4, step=1,
+            help="Numbered catalog pages requested at once (A-Stock, 702Auctions, BidFTA, Vista); stops at the first empty page"
+        ),
+        'driver_pool_size': st.number_input(
+            "Browser instances", min_value=1, max_value=8, value=2, step=1,
+            help="Headless Chrome windows loading pages in parallel (HiBid, BiddingKings, BidLlama). Each uses ~300MB RAM"
+        ),
+        'block_resources': st.checkbox(
+            "Block images, fonts & trackers in Chrome", value=True,
+            help="Faster page loads; turn off once per site to record the unblocked page size used for the 'KB saved' stat"
+        ),
+        'listing_only': st.checkbox(
+            "Listing-only mode", value=False,
+            help="Nellis, BidFTA, BiddingKings: take prices straight from the listing cards and open a lot's page only when its card is missing a price"
+        ),
+        'ai_priority': st.selectbox(
+            "AI pricing order", list(AI_PRIORITIES), format_func=AI_PRIORITIES.get,
+            help="Which queued lots get Gemini quota first; lots left when the quota runs out are listed under 'Unpriced Lots'"
+        ),
+        'ai_priority_keywords': st.text_input(
+            "Priority keywords", placeholder="e.g. dyson, kitchenaid, laptop",
+            help="With 'Keyword matches first': comma-separated words looked for in lot titles and categories"
+        ),
+        'ai_batch_size': st.number_input(
+            "Lots per AI request", min_value=1, max_value=10, value=4, step=1,
+            help="Lots (titles and images) priced together in one Gemini request; lots missing from the answer are retried one by one"
+        ),
+        'ai_image_max_edge': st.number_input(
+            "AI image size (px)", min_value=256, max_value=2048, value=768, step=128,
+            help="Lot images are shrunk to this many pixels on the longest side and sent as JPEG; smaller images upload faster and cost fewer tokens per AI price lookup"
+        ),
+        'capture_api': st.checkbox(
+            "Read lots from site APIs (experimental)", value=False,
+            help="HiBid, BiddingKings, BidLlama, MAC.bid: parse the JSON the page loads its lots from instead of the rendered HTML. Falls back to the page when no lot JSON is found; the endpoint used shows in Run Stats"
+        )
+    }
+    
     st.markdown("---")
     st.header("📖 How to Use")
     st.markdown("""
@@ -359,20 +428,26 @@ def run_scraper(site_name, url, start_page, end_page, requires_ai=True):
     
     st.session_state.is_scraping = True
     st.session_state.results_df = pd.DataFrame()
+    st.session_state.run_stats = {}
+    st.session_state.unpriced_df = pd.DataFrame()
 
     status_placeholder = st.empty()
     progress_placeholder = st.empty()
     
-    metric_cols = st.columns(3)
+    metric_cols = st.columns(5)
     pages_metric = metric_cols[0].empty()
     lots_metric = metric_cols[1].empty()
     recovery_metric = metric_cols[2].empty()
+    cache_metric = metric_cols[3].empty()
+    ai_queue_metric = metric_cols[4].empty()
     
     dataframe_placeholder = st.empty()
     
     pages_metric.metric("Pages Scraped", 0)
     lots_metric.metric("Lots Scraped", 0)
     recovery_metric.metric("Average Recovery", "0%")
+    cache_metric.metric("AI Cache Hits", "—")
+    ai_queue_metric.metric("AI Queue", 0)
     progress_placeholder.progress(0)
     
     ui_placeholders = {
@@ -382,14 +457,17 @@ def run_scraper(site_name, url, start_page, end_page, requires_ai=True):
         'metrics': {
             'pages': pages_metric,
             'lots': lots_metric,
-            'recovery': recovery_metric
+            'recovery': recovery_metric,
+            'cache': cache_metric,
+            'ai_queue': ai_queue_metric
         }
     }
     
     api_keys = st.session_state.api_keys if requires_ai else []
     st.session_state.scraper_instance = AuctionScraper(
         gemini_api_keys=api_keys,
-        ui_placeholders=ui_placeholders
+        ui_placeholders=ui_placeholders,
+        settings=st.session_state.get('scraper_settings')
     )
     
     try:
@@ -404,6 +482,9 @@ def run_scraper(site_name, url, start_page, end_page, requires_ai=True):
     except Exception as e:
         status_placeholder.error(f"An error occurred during scraping: {str(e)}")
     
+    if st.session_state.scraper_instance:
+        st.session_state.run_stats = st.session_state.scraper_instance.get_run_stats()
+        st.session_state.unpriced_df = pd.DataFrame(st.session_state.scraper_instance.unpriced_lots)
     st.session_state.is_scraping = False
     st.rerun()
 
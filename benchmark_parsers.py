@@ -0,0 +1,110 @@
+"""Time the scraper's page parsers with each HTML parser backend.
+
+Usage:
+    python benchmark_parsers.py SITE PAGE [--runs N]
+
+SITE is a key of scraper.PARSE_SUBTREES (e.g. "Nellis lot", "HiBid", "Vista")
+and PAGE is a saved HTML file or a URL. Every backend runs the site's real
+parser; a result that differs from the html.parser baseline is flagged. Lot
+parsers match embedded JSON against PAGE's URL, or the saved page's canonical link.
+"""
+import argparse
+import functools
+import statistics
+import time
+
+import requests
+
+import scraper
+
+
+def card_parser(site):
+    return lambda html: scraper.CARD_PARSERS[site](scraper.make_soup(html, site))
+
+
+def section_texts(site):
+    return lambda html: [section.text for section in scraper.make_soup(html, site).find_all("section")]
+
+
+SITE_PARSERS = {
+    "Nellis lot": scraper.parse_nellis_detail,
+    "BidFTA lot": scraper.parse_bidfta_detail,
+    "BiddingKings lot": scraper.parse_biddingkings_detail,
+    "Nellis": lambda html: [str(li.find("a")) for li in scraper.make_soup(html, "Nellis").find_all("li", class_="__list-item-base")],
+    "BidFTA": lambda html: [str(div.find("a")) for div in scraper.make_soup(html, "BidFTA").find_all("div", class_="block")],
+    "A-Stock": section_texts("A-Stock"),
+    "702Auctions": section_texts("702Auctions"),
+}
+SITE_PARSERS.update({site: card_parser(site) for site in scraper.CARD_PARSERS})
+
+# (label, BeautifulSoup backend, restrict to PARSE_SUBTREES, use selectolax, try embedded JSON first)
+BACKENDS = [
+    ("html.parser, full page", "html.parser", False, False, False),
+    ("lxml, full page", "lxml", False, False, False),
+    ("lxml + SoupStrainer", "lxml", True, False, False),
+    ("selectolax subtree + lxml", "lxml", True, True, False),
+    ("embedded JSON, then DOM", "lxml", True, True, True),
+]
+
+
+def run_backend(parse, html, backend, subtrees, fast, embedded, runs):
+    """(mean seconds, result) of parse(html) with the scraper module switched to one backend"""
+    saved = (scraper.HTML_PARSER, scraper.PARSE_SUBTREES, scraper.FastHTMLParser, scraper.EMBEDDED_JSON_PATTERNS)
+    scraper.HTML_PARSER = backend
+    scraper.PARSE_SUBTREES = saved[1] if subtrees else {}
+    scraper.FastHTMLParser = saved[2] if fast else None
+    scraper.EMBEDDED_JSON_PATTERNS = saved[3] if embedded else []
+    try:
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = parse(html)
+            times.append(time.perf_counter() - started)
+        if isinstance(result, dict):
+            # Embedded JSON gives bare numbers where the page shows "$12.00", and
+            # a missing category may be None or blank
+            result = {key: float(scraper.clean_bidfta_price(value)) if key.endswith("_price")
+                      else (value or "").strip() or None if key == "category" else value
+                      for key, value in result.items() if key != 'source'}
+        return statistics.mean(times), result
+    finally:
+        scraper.HTML_PARSER, scraper.PARSE_SUBTREES, scraper.FastHTMLParser, scraper.EMBEDDED_JSON_PATTERNS = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on one page")
+    parser.add_argument("site", choices=sorted(SITE_PARSERS))
+    parser.add_argument("page", help="saved HTML file or URL")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.page.startswith("http"):
+        html = requests.get(args.page, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30).text
+    else:
+        with open(args.page, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+
+    parse = SITE_PARSERS[args.site]
+    if args.page.startswith("http") and args.site.endswith(" lot"):
+        parse = functools.partial(parse, url=args.page)
+
+    print(f"{args.site}: {len(html) / 1024:,.0f} KB page, {args.runs} runs, subtree: {scraper.PARSE_SUBTREES[args.site]}")
+    baseline = None
+    for label, backend, subtrees, fast, embedded in BACKENDS:
+        if backend == "lxml" and scraper.HTML_PARSER != "lxml":
+            print(f"{label:28} skipped (lxml not installed)")
+            continue
+        if fast and scraper.FastHTMLParser is None:
+            print(f"{label:28} skipped (selectolax not installed)")
+            continue
+        if embedded and args.site not in ("Nellis lot", "BidFTA lot"):
+            continue
+        seconds, result = run_backend(parse, html, backend, subtrees, fast, embedded, args.runs)
+        if baseline is None:
+            baseline = (seconds, result)
+        note = "" if result == baseline[1] else "  RESULT DIFFERS"
+        print(f"{label:28} {seconds * 1000:8.1f} ms  {baseline[0] / seconds:5.1f}x{note}")
+
+
+if __name__ == "__main__":
+    main()
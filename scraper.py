@@ -1,13 +1,25 @@
 import sys
 import os
+import json
 import requests
+from requests.adapters import HTTPAdapter
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import statistics
 import traceback
 import io
+import math
+import multiprocessing
+import threading
+import queue
+import itertools
+import hashlib
+import sqlite3
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+from urllib.parse import urlparse, parse_qsl
 import pandas as pd
 
 # Google Gemini API imports
@@ -21,11 +33,1172 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException, InvalidSessionIdException, NoSuchWindowException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import base64
 
+# Optional: Chrome TLS impersonation for sessions handed over from the browser
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:
+    curl_requests = None
+
+# Optional: faster HTML parsing (lxml backend for BeautifulSoup, selectolax to
+# cut pages down to the nodes a parser needs)
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+try:
+    from selectolax.lexbor import LexborHTMLParser as FastHTMLParser
+except ImportError:
+    FastHTMLParser = None
+
+# Optional: downscale lot images before sending them to Gemini
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+NELLIS_SOLD_PRICE_CLASS = "text-gray-900 font-semibold line-clamp-1 text-label-sm xxs:text-title-xs xs:text-label-md sm:text-title-xs md:text-title-sm lg:text-title-md xl:text-title-sm xxl:text-title-xs"
+NELLIS_CATEGORY_CLASS = "flex items-center gap-1 text-secondary focus-within:outline-secondary hover:underline hover:text-secondary-light w-fit"
+BIDFTA_GRID_CLASS = "grid grid-cols-1 gap-5 md:gap-6 pb-8 xl:pb-16 md:grid-cols-3 2xl:grid-cols-4"
+NELLIS_GRID_RETAIL_CLASS = "grid grid-cols-[minmax(0,_0.6fr)_minmax(0,_1fr)] gap-2 text-left"
+# Lots on a full Nellis search page; a shorter page may be the whole catalog
+NELLIS_PAGE_SIZE = 120
+
+# The only parts of each page its parser reads, as a CSS selector. Exact
+# [class="..."] matches mirror BeautifulSoup's multi-class class_ lookups.
+PARSE_SUBTREES = {
+    "Nellis": "li.__list-item-base, a.__pagination-link",
+    "Nellis lot": f'h1, p[class="{NELLIS_SOLD_PRICE_CLASS}"], div[class="flex flex-col text-left"], '
+                  f'div[class="{NELLIS_GRID_RETAIL_CLASS}"], a[class="{NELLIS_CATEGORY_CLASS}"]',
+    "BidFTA": f'div[class="{BIDFTA_GRID_CLASS}"]',
+    "BidFTA lot": 'h2, div[class="flex gap-1 xs:gap-2 items-end text-bidfta-blue-light"], div[class="flex gap-1 xs:gap-2 items-end"]',
+    "BiddingKings lot": "span.sold-amount",
+    "HiBid": "app-lot-tile",
+    "BiddingKings": "div[class*='lot-repeater-index']",
+    "BidLlama": 'div[class="item-row grid"]',
+    "MAC.bid": 'div[class="d-block w-100 border-bottom"]',
+    "A-Stock": "section",
+    "702Auctions": "section",
+    "Vista": "section",
+    "BidSoflo": 'div[class="row mr-1"], li.page-item',
+    "BidAuctionDepot": 'div[class*="card grid-card a gallery auction"]',
+}
+
+
+def make_soup(html, site=None):
+    """BeautifulSoup of html, restricted to the site's PARSE_SUBTREES selector if it has one.
+
+    With selectolax installed only the matching nodes are handed to
+    BeautifulSoup; without it, selectors that are plain tag names become a
+    SoupStrainer and anything else is parsed in full.
+    """
+    selector = PARSE_SUBTREES.get(site)
+    if selector and FastHTMLParser is not None:
+        kept = []
+        kept_ids = set()
+        for node in FastHTMLParser(html).css(selector):
+            parent = node.parent
+            while parent is not None and parent.mem_id not in kept_ids:
+                parent = parent.parent
+            if parent is None:  # Not inside a node that is already kept
+                kept.append(node.html)
+                kept_ids.add(node.mem_id)
+        return BeautifulSoup("".join(kept), HTML_PARSER)
+    tags = [part.strip() for part in selector.split(",")] if selector else []
+    if tags and all(re.fullmatch(r"[\w-]+", tag) for tag in tags):
+        return BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer(tags))
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def clean_bidfta_price(price_text):
+    """Strip a BidFTA price label down to its digits"""
+    price = re.sub(r"[^\d.]", "", price_text)
+    if price.startswith("."):
+        price = price[1:]
+    if price.endswith("."):
+        price = price[:-1]
+    return price
+
+
+# Embedded page data tried before the DOM: JSON-LD blocks and Next.js' __NEXT_DATA__
+EMBEDDED_JSON_PATTERNS = [
+    re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S),
+    re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S),
+]
+# Candidate paths per lot field inside those blobs (see json_path); category is optional
+EMBEDDED_LOT_FIELDS = {
+    "Nellis": {
+        'title': ['title', 'name'],
+        'sold_price': ['currentPrice', 'current_price', 'winningBid', 'offers.price'],
+        'retail_price': ['retailPrice', 'retail_price', 'estimatedRetailPrice', 'msrp'],
+        'category': ['category.description', 'category.name', 'categoryName'],
+    },
+    "BidFTA": {
+        'title': ['title', 'itemTitle', 'name'],
+        'sold_price': ['currentBid', 'current_bid', 'offers.price'],
+        'retail_price': ['msrp', 'MSRP', 'retailPrice', 'retail_price'],
+    },
+}
+PRICE_VALUE = re.compile(r"\$?[\d,]+(\.\d+)?")
+# Fields identifying which lot an embedded record describes (lot pages also embed related lots)
+EMBEDDED_LOT_IDS = ['id', 'lotId', 'lot_id', 'itemId', 'item_id', 'sku', 'productID']
+EMBEDDED_LOT_URLS = ['url', '@id', 'offers.url', 'href']
+CANONICAL_URL = re.compile(r'<(?:link[^>]*rel="canonical"|meta[^>]*property="og:url")[^>]*(?:href|content)="([^"]+)"')
+
+
+def is_record_for(node, url):
+    """True if a JSON record's id or URL matches the lot page at url"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip("/")
+    keys = {segment for segment in path.split("/") if segment} | {value for _, value in parse_qsl(parsed.query)}
+    for id_path in EMBEDDED_LOT_IDS:
+        value = json_path(node, id_path)
+        if isinstance(value, (str, int)) and not isinstance(value, bool) and str(value) in keys:
+            return True
+    for url_path in EMBEDDED_LOT_URLS:
+        value = json_path(node, url_path)
+        if isinstance(value, str) and value and urlparse(value).path.rstrip("/") == path:
+            return True
+    return False
+
+
+def find_embedded_lot(html, site, url=None):
+    """Lot dict from the record in the page's embedded JSON that describes the lot at url
+    (default: the page's canonical URL), or None when no such record has a title and both
+    prices or the lot's URL is unknown"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    if url is None:
+        canonical = CANONICAL_URL.search(html)
+        if not canonical:
+            return None
+        url = canonical.group(1)
+    fields = EMBEDDED_LOT_FIELDS[site]
+    for pattern in EMBEDDED_JSON_PATTERNS:
+        for match in pattern.finditer(html):
+            try:
+                stack = [json.loads(match.group(1))]
+            except ValueError:
+                continue
+            while stack:
+                node = stack.pop()
+                if isinstance(node, list):
+                    stack.extend(reversed(node))
+                    continue
+                if not isinstance(node, dict):
+                    continue
+                lot = {}
+                for name, paths in fields.items():
+                    lot[name] = next((v for v in (json_path(node, p) for p in paths) if isinstance(v, (str, int, float))), None)
+                if (lot['title'] and lot['sold_price'] is not None and lot['retail_price'] is not None
+                        and PRICE_VALUE.fullmatch(str(lot['sold_price'])) and PRICE_VALUE.fullmatch(str(lot['retail_price']))
+                        and is_record_for(node, url)):
+                    category = str(lot['category']).strip() if lot.get('category') is not None else ""
+                    return {"title": str(lot['title']).strip(), "sold_price": str(lot['sold_price']),
+                            "retail_price": str(lot['retail_price']), "category": category or None, "source": "json"}
+                stack.extend(reversed(list(node.values())))
+    return None
+
+
+def parse_nellis_detail(html, url=None):
+    """Parse the Nellis lot page at url into a lot dict, or None if it has no sold/retail price"""
+    lot = find_embedded_lot(html, "Nellis", url)
+    if lot:
+        return lot
+    soup = make_soup(html, "Nellis lot")
+    title = soup.find("h1")
+    title = title.text if title else "Unknown Title"
+
+    sold_price = " "
+    for x in soup.find_all("p", class_=NELLIS_SOLD_PRICE_CLASS):
+        if "$" in x.text:
+            sold_price = x.text
+            break
+    if sold_price == " ":
+        return None
+
+    retail_price = " "
+    for x in soup.find_all("div", class_="flex flex-col text-left"):
+        if "Estimated Retail Price" in x.text:
+            retail_price = x.text.replace("Estimated Retail Price", "").strip()
+            break
+
+    if retail_price == " ":
+        for x in soup.find_all("div", class_=NELLIS_GRID_RETAIL_CLASS):
+            if "Estimated Retail Price" in x.text:
+                retail_price = x.text.replace("Estimated Retail Price", "").strip()
+                break
+    if retail_price == " ":
+        return None
+
+    category = None  # Same as the embedded-JSON path when the page has none
+    category_tmp = soup.find("a", class_=NELLIS_CATEGORY_CLASS)
+    if category_tmp:
+        category = category_tmp.text.strip() or None
+
+    return {"title": title, "sold_price": sold_price, "retail_price": retail_price, "category": category, "source": "html"}
+
+
+def parse_bidfta_detail(html, url=None):
+    """Parse the BidFTA lot page at url into a lot dict, or None if it has no bid/MSRP"""
+    lot = find_embedded_lot(html, "BidFTA", url)
+    if lot:
+        return lot
+    soup = make_soup(html, "BidFTA lot")
+    title_elem = soup.find("h2")
+    title = title_elem.text.strip() if title_elem else "Unknown Title"
+
+    sold_price = " "
+    for elem in soup.find_all("div", class_="flex gap-1 xs:gap-2 items-end text-bidfta-blue-light"):
+        if "CURRENT BID" in elem.text:
+            sold_price = clean_bidfta_price(elem.text.replace("\n", "").replace("CURRENT BID", "").strip())
+            break
+    if sold_price == " ":
+        return None
+
+    retail_price = " "
+    for elem in soup.find_all("div", class_="flex gap-1 xs:gap-2 items-end"):
+        if "MSRP" in elem.text:
+            retail_price = clean_bidfta_price(elem.text.replace("MSRP", "").replace("\n", "").strip())
+            break
+    if retail_price == " ":
+        return None
+
+    return {"title": title, "sold_price": sold_price, "retail_price": retail_price, "category": None, "source": "html"}
+
+
+# Price labels on listing cards (listing-only mode)
+CARD_SOLD_PRICE = re.compile(r"(?:Current (?:Price|Bid)|Sold(?: Price| For)?|Winning Bid|Won For)\D{0,20}?\$\s*([\d,]+(?:\.\d+)?)", re.I)
+CARD_RETAIL_PRICE = re.compile(r"(?:(?:Est\.?|Estimated) Retail(?: Price)?|Retail(?: Price)?|MSRP)\D{0,20}?\$\s*([\d,]+(?:\.\d+)?)", re.I)
+
+
+def parse_listing_card(card, link_tag):
+    """Lot dict from a listing card that shows both a sold/current and a retail price, or None"""
+    text = card.get_text(" ", strip=True)
+    sold_price = CARD_SOLD_PRICE.search(text)
+    retail_price = CARD_RETAIL_PRICE.search(text)
+    if not sold_price or not retail_price:
+        return None
+    heading = card.find(["h1", "h2", "h3", "h4", "h5", "h6"]) or link_tag
+    return {"title": heading.get_text(" ", strip=True), "sold_price": sold_price.group(1),
+            "retail_price": retail_price.group(1), "category": None, "source": "listing"}
+
+
+def timed_parse(parse_detail, html, url):
+    """(parse_detail(html, url), CPU seconds it took); module-level so process pools can pickle it"""
+    started = time.thread_time()
+    lot = parse_detail(html, url)
+    return lot, time.thread_time() - started
+
+
+def parse_biddingkings_detail(html, url=None):
+    """Sold amount text of a BiddingKings lot page, or None if it is not in the HTML
+    (url is accepted for the common detail-parser signature; the page has no JSON)"""
+    price_tag = make_soup(html, "BiddingKings lot").find("span", class_="sold-amount")
+    return price_tag.text if price_tag and price_tag.text.strip() else None
+
+
+# In-browser extraction: each script returns the raw lot fields of the current
+# page as one JSON array, so the DOM never has to be serialized via page_source.
+# The parse_*_cards functions below produce the same dicts from a soup.
+EXTRACT_SCRIPTS = {
+    "HiBid": """
+        return Array.from(document.querySelectorAll('app-lot-tile')).map(tile => {
+            const title = tile.querySelector('h2.lot-title'), link = tile.querySelector('a');
+            const img = tile.querySelector('img.lot-thumbnail.img-fluid'), price = tile.querySelector('strong.lot-price-realized');
+            if (!title || !link || !img || !price) return null;
+            return {title: title.textContent, href: link.getAttribute('href'), image: img.getAttribute('src'), price: price.textContent};
+        }).filter(Boolean);
+    """,
+    "BiddingKings": """
+        return Array.from(document.querySelectorAll("div[class*='lot-repeater-index']")).map(card => {
+            const link = card.querySelector('a'), img = card.querySelector('img'), sold = card.querySelector('span.sold-amount');
+            if (!link || !img) return null;
+            return {title: link.textContent, href: link.getAttribute('href'), image: img.getAttribute('ng-src'),
+                    sold: sold && sold.textContent.trim() ? sold.textContent : null};
+        }).filter(Boolean);
+    """,
+    "BidLlama": """
+        const container = document.querySelector('div.item-row.grid');
+        if (!container) return [];
+        return Array.from(container.children).filter(el => el.tagName === 'DIV').map(item => {
+            const title = item.querySelector('p.item-title'), imgBox = item.querySelector('p.item-image');
+            const price = item.querySelector('p.item-current-bid');
+            if (!title || !imgBox || !price) return null;
+            const link = imgBox.querySelector('a'), img = imgBox.querySelector('img');
+            if (!link || !img) return null;
+            return {title: title.textContent, href: link.getAttribute('href'), image: img.getAttribute('src') || '', price: price.textContent};
+        }).filter(Boolean);
+    """,
+    "MAC.bid": """
+        return Array.from(document.querySelectorAll('div.d-block.w-100.border-bottom')).map(card => {
+            const first = card.querySelector('p'), won = card.querySelector('p.badge.badge-success');
+            const retail = card.querySelector('p.font-size-sm'), link = card.querySelector('a');
+            return {title: first ? first.textContent : null, won: won ? won.textContent : null,
+                    retail: retail ? retail.textContent : null, href: link ? link.getAttribute('href') : null};
+        });
+    """,
+    "Vista": """
+        return Array.from(document.querySelectorAll('section')).map(section => {
+            const title = section.querySelector('h2.title.inlinebidding'), subtitle = section.querySelector('h3.subtitle');
+            const link = subtitle ? subtitle.querySelector('a') : null, sold = section.querySelector('span.NumberPart');
+            return {title: title ? title.textContent : null, href: link ? link.getAttribute('href') : null,
+                    sold: sold ? sold.textContent : null, retail: subtitle ? subtitle.textContent : null};
+        });
+    """,
+    "BidSoflo": """
+        const lots = Array.from(document.querySelectorAll('div.row.mr-1')).map(card => {
+            const tooltip = card.querySelector('div.tooltip-demos'), bid = card.querySelector('div.font-bold.text-body');
+            const link = card.querySelector('a');
+            return {details: tooltip ? Array.from(tooltip.children).filter(el => el.tagName === 'DIV').map(el => el.textContent) : null,
+                    bid: bid ? bid.textContent : null, href: link ? link.getAttribute('href') : null};
+        });
+        let next = null;
+        for (const item of document.querySelectorAll('li.page-item')) {
+            if (item.textContent.toLowerCase().includes('next')) {
+                const link = item.querySelector('a.page-link');
+                next = link ? link.getAttribute('data-url') : null;
+            }
+        }
+        return {lots: lots, next: next};
+    """,
+    "BidAuctionDepot": """
+        return Array.from(document.querySelectorAll('div[class*="card grid-card a gallery auction"]')).map(card => {
+            const title = card.querySelector('h5'), retail = card.querySelector('h6.galleryPrice.rtlrPrice');
+            const bid = card.querySelector('span.curBidAmtt');
+            return {title: title ? title.textContent : null, retail: retail ? retail.textContent : null,
+                    bid: bid ? bid.textContent : null, id: card.getAttribute('id')};
+        });
+    """,
+}
+
+
+def parse_hibid_cards(soup):
+    cards = []
+    for p in soup.find_all("app-lot-tile"):
+        title_tag = p.find("h2", class_="lot-title")
+        link_tag = p.find("a")
+        img_tag = p.find("img", class_="lot-thumbnail img-fluid")
+        price_tag = p.find("strong", class_="lot-price-realized")
+        if all([title_tag, link_tag, img_tag, price_tag]):
+            cards.append({'title': title_tag.text, 'href': link_tag.get("href"), 'image': img_tag['src'], 'price': price_tag.text})
+    return cards
+
+
+def parse_biddingkings_cards(soup):
+    cards = []
+    for p in soup.find_all("div", class_=re.compile(r'lot-repeater-index')):
+        link_tag = p.find("a")
+        img_tag = p.find("img")
+        sold_tag = p.find("span", class_="sold-amount")
+        if link_tag and img_tag:
+            cards.append({'title': link_tag.text, 'href': link_tag.get("href"), 'image': img_tag.get('ng-src'),
+                          'sold': sold_tag.text if sold_tag and sold_tag.text.strip() else None})
+    return cards
+
+
+def parse_bidllama_cards(soup):
+    item_container = soup.find("div", class_="item-row grid")
+    if not item_container:
+        return []
+    cards = []
+    for p in item_container.find_all("div", recursive=False):
+        title_tag = p.find("p", class_="item-title")
+        img_container = p.find("p", class_="item-image")
+        price_tag = p.find("p", class_="item-current-bid")
+        if title_tag and img_container and price_tag:
+            link_tag = img_container.find("a")
+            img_tag = img_container.find("img")
+            if link_tag and img_tag:
+                cards.append({'title': title_tag.text, 'href': link_tag.get("href"), 'image': img_tag.get('src', ''), 'price': price_tag.text})
+    return cards
+
+
+def parse_macbid_cards(soup):
+    cards = []
+    for product in soup.find_all("div", class_="d-block w-100 border-bottom"):
+        first = product.find("p")
+        won = product.find("p", class_="badge badge-success")
+        retail = product.find("p", class_="font-size-sm")
+        link_tag = product.find("a")
+        cards.append({
+            'title': first.text if first else None,
+            'won': won.text if won else None,
+            'retail': retail.text if retail else None,
+            'href': link_tag.get("href") if link_tag else None
+        })
+    return cards
+
+
+def parse_vista_cards(soup):
+    cards = []
+    for section in soup.find_all("section"):
+        title_elem = section.find("h2", class_="title inlinebidding")
+        subtitle = section.find("h3", class_="subtitle")
+        link_tag = subtitle.find("a") if subtitle else None
+        sold_price_elem = section.find("span", class_="NumberPart")
+        cards.append({
+            'title': title_elem.text if title_elem else None,
+            'href': link_tag.get("href") if link_tag else None,
+            'sold': sold_price_elem.text if sold_price_elem else None,
+            'retail': subtitle.text if subtitle else None
+        })
+    return cards
+
+
+def parse_bidsoflo_cards(soup):
+    lots = []
+    for p in soup.find_all("div", class_="row mr-1"):
+        tool = p.find("div", class_="tooltip-demos")
+        bid = p.find("div", class_="font-bold text-body")
+        link_tag = p.find("a")
+        lots.append({
+            'details': [xi.text for xi in tool.find_all("div", recursive=False)] if tool else None,
+            'bid': bid.text if bid else None,
+            'href': link_tag.get("href") if link_tag else None
+        })
+    next_url = None
+    for pa in soup.find_all("li", class_="page-item"):
+        if "next" in pa.text.lower():
+            link = pa.find("a", class_="page-link")
+            next_url = link.get("data-url") if link is not None else None
+    return {'lots': lots, 'next': next_url}
+
+
+def parse_bidauctiondepot_cards(soup):
+    cards = []
+    for p in soup.find_all('div', class_=lambda c: c and "card grid-card a gallery auction" in c):
+        title_elem = p.find("h5")
+        retail_price_elem = p.select_one("h6.galleryPrice.rtlrPrice")
+        sold_price_elem = p.find("span", class_="curBidAmtt")
+        cards.append({
+            'title': title_elem.text if title_elem else None,
+            'retail': retail_price_elem.text if retail_price_elem else None,
+            'bid': sold_price_elem.text if sold_price_elem else None,
+            'id': p.get("id")
+        })
+    return cards
+
+
+CARD_PARSERS = {
+    "HiBid": parse_hibid_cards,
+    "BiddingKings": parse_biddingkings_cards,
+    "BidLlama": parse_bidllama_cards,
+    "MAC.bid": parse_macbid_cards,
+    "Vista": parse_vista_cards,
+    "BidSoflo": parse_bidsoflo_cards,
+    "BidAuctionDepot": parse_bidauctiondepot_cards,
+}
+
+
+# Where the lot fields live in the JSON behind the client-rendered sites, as
+# candidate paths per card field (first non-empty wins; "a.b.0" walks into
+# nested objects and lists). "href" falls back to href_template with the lot
+# id. Records missing any field are skipped, so a stale guess just means the
+# page is extracted from the DOM as before.
+API_LOT_FIELDS = {
+    "HiBid": {
+        'title': ['lead', 'title', 'description'],
+        'href': ['url', 'lotUrl'],
+        'id': ['itemId', 'id'],
+        'href_template': '/lot/{}',
+        'image': ['featuredPicture.thumbnailLocation', 'featuredPicture.fullSizeLocation', 'pictures.0.thumbnailLocation'],
+        'price': ['lotState.priceRealized', 'priceRealized'],  # Realized only, like the DOM; a high bid may be unsold
+    },
+    "BiddingKings": {
+        'title': ['title', 'name'],
+        'href': ['url', 'lot_url', 'link'],
+        'id': ['id', 'lot_id'],
+        'href_template': '/lot/{}',
+        'image': ['images.0.thumb_url', 'images.0.url', 'thumbnail', 'image'],
+    },
+    "BidLlama": {
+        'title': ['title', 'name'],
+        'href': ['url', 'item_url', 'link'],
+        'id': ['id', 'item_id'],
+        'href_template': '/item/{}',
+        'image': ['image', 'thumbnail', 'images.0.url'],
+        'price': ['current_bid', 'high_bid', 'price'],
+    },
+    "MAC.bid": {
+        'title': ['product_name', 'title', 'name'],
+        'href': ['url', 'lot_url'],
+        'id': ['id', 'lot_id'],
+        'href_template': '/lot/{}',
+        'won': ['winning_bid', 'closing_price'],  # Not current_bid: open lots have one too
+        'retail': ['retail_price', 'msrp'],
+    },
+}
+
+
+def json_path(record, path):
+    """Value at a dotted path such as "pictures.0.url", or None"""
+    value = record
+    for key in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+
+def map_api_lot(record, fields):
+    """Card dict (same shape as the site's EXTRACT_SCRIPTS result) from one JSON record, or None"""
+    card = {}
+    for name, paths in fields.items():
+        if name in ('id', 'href_template'):
+            continue
+        value = next((v for v in (json_path(record, p) for p in paths) if v not in (None, "")), None)
+        if value is None and name == 'href':
+            lot_id = next((v for v in (json_path(record, p) for p in fields.get('id', [])) if v not in (None, "")), None)
+            value = fields['href_template'].format(lot_id) if lot_id is not None else None
+        if value is None or isinstance(value, (dict, list)):
+            return None
+        if name == 'href' and str(value).startswith("http"):
+            parsed = urlparse(str(value))
+            value = parsed.path + (f"?{parsed.query}" if parsed.query else "")  # Scrapers prefix their base_url
+        card[name] = str(value)
+    return card
+
+
+def find_api_lots(payload, fields):
+    """Walk a JSON payload and return the longest list of records that map to lot cards"""
+    best = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            records = [r for r in node if isinstance(r, dict)]
+            if records:
+                cards = [card for card in (map_api_lot(r, fields) for r in records) if card]
+                if len(cards) > len(best):
+                    best = cards
+            stack.extend(node)
+    return best
+
+
+# MAC.bid infinite scroll: returns only the cards added since the last call
+# (harvested cards are tagged in the DOM), the total loaded and whether the
+# loading spinner is showing.
+MACBID_HARVEST_SCRIPT = """
+    const all = document.querySelectorAll('div.d-block.w-100.border-bottom');
+    const fresh = Array.from(all).filter(card => !card.hasAttribute('data-harvested'));
+    fresh.forEach(card => card.setAttribute('data-harvested', '1'));
+    return {
+        lots: fresh.map(card => {
+            const first = card.querySelector('p'), won = card.querySelector('p.badge.badge-success');
+            const retail = card.querySelector('p.font-size-sm'), link = card.querySelector('a');
+            return {title: first ? first.textContent : null, won: won ? won.textContent : null,
+                    retail: retail ? retail.textContent : null, href: link ? link.getAttribute('href') : null};
+        }),
+        total: all.length,
+        loading: document.querySelector('div.spinner-grow') !== null
+    };
+"""
+
+
+# Resolves once no elements have been added or removed and no new resources have
+# loaded for quietMs (or when timeoutMs runs out); returns which of the two happened.
+PAGE_READY_SCRIPT = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const start = performance.now();
+let lastChange = start;
+let resources = performance.getEntriesByType('resource').length;
+// Only elements being added or removed count: countdown timers and live bid
+// figures rewrite text and attributes every second and would never go quiet
+const observer = new MutationObserver(records => {
+    for (const record of records) {
+        for (const node of [...record.addedNodes, ...record.removedNodes]) {
+            if (node.nodeType === Node.ELEMENT_NODE) { lastChange = performance.now(); return; }
+        }
+    }
+});
+observer.observe(document.documentElement || document, {childList: true, subtree: true});
+(function check() {
+    const now = performance.now();
+    const count = performance.getEntriesByType('resource').length;
+    if (count !== resources) { resources = count; lastChange = now; }
+    if (document.readyState === 'complete' && now - lastChange >= quietMs) { observer.disconnect(); done('quiet'); return; }
+    if (now - start >= timeoutMs) { observer.disconnect(); done('timeout'); return; }
+    setTimeout(check, 50);
+})();
+"""
+
+CLOUDFLARE_MARKERS = ("Checking your browser", "Just a moment...")
+
+# Returns 'lots' once a lot element exists, a reason string once the page shows
+# it is past the end of the catalog, or null while it is still loading. Only the
+# results container's text is checked (not headers or carts showing "0 items"),
+# and only after the DOM has been quiet for quietMs, since these client-rendered
+# pages draw their lots after readyState is already 'complete'.
+END_OF_RESULTS_SCRIPT = """
+const lotSelector = arguments[0], phrases = arguments[1], containerSelectors = arguments[2], quietMs = arguments[3];
+if (document.querySelector(lotSelector)) return 'lots';
+if (document.readyState !== 'complete' || !document.body) return null;
+const now = performance.now();
+let watch = window.__endOfResultsWatch;
+if (!watch || watch.root !== document.documentElement) {
+    watch = window.__endOfResultsWatch = {root: document.documentElement, lastChange: now};
+    new MutationObserver(() => { watch.lastChange = performance.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    return null;
+}
+if (now - watch.lastChange < quietMs) return null;
+// Selectors in priority order: querySelector on a selector list would return
+// whichever matches first in the document, i.e. an enclosing <main>
+let container = null;
+for (const selector of containerSelectors) {
+    container = document.querySelector(selector);
+    if (container) break;
+}
+if (!container) return null;
+const text = container.innerText.toLowerCase();
+for (const phrase of phrases) {
+    if (text.includes(phrase)) return 'empty-state marker "' + phrase + '"';
+}
+const count = text.match(/\\b(?:showing\\s+)?0\\s+(?:lots|items|results)\\b/);
+if (count) return 'result count "' + count[0] + '"';
+return null;
+"""
+
+# Empty-state wording per site (lowercase, matched against the results container's text)
+END_OF_RESULTS_PHRASES = {
+    "HiBid": ["no lots found", "no lots match", "there are no lots"],
+    "BiddingKings": ["no lots found", "no items found", "no results found"],
+    "BidLlama": ["no items found", "no results found", "no items match"],
+}
+# Where each site renders its results (and its empty state); the first selector
+# that matches anything is used, so broad fallbacks like main go last
+END_OF_RESULTS_CONTAINERS = {
+    "HiBid": ["app-lot-list", "app-catalog", "main"],
+    "BiddingKings": ["div.lots-container", "div[class*='lot-list']", "main"],
+    "BidLlama": ["div.item-row.grid", "main"],
+}
+
+
+class EndOfCatalog(list):
+    """Empty page result that carries why the catalog ended"""
+
+    def __init__(self, reason):
+        super().__init__()
+        self.reason = reason
+
+
+def is_driver_crash(error):
+    """True if a WebDriver error means the browser itself is gone, not just the page"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in ("chrome not reachable", "session deleted", "disconnected", "tab crashed", "no such window"))
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "auction-scraper")
+DRIVER_PATH_CACHE = os.path.join(CACHE_DIR, "chromedriver.json")
+PAGE_BYTES_CACHE = os.path.join(CACHE_DIR, "page_bytes.json")  # Unblocked bytes/page per site
+PRICE_CACHE_DB = os.path.join(CACHE_DIR, "gemini_prices.sqlite3")
+AI_IMAGE_DIR = os.path.join(CACHE_DIR, "ai_images")  # Downscaled images sent to Gemini
+
+
+def extension_patterns(*extensions):
+    """Blocked-URL patterns for files with these extensions, with or without a
+    query string (CDNs serve images as .../img.jpg?w=300)"""
+    return [f"*.{extension}{query}" for extension in extensions for query in ("", "?*")]
+
+
+# URL patterns blocked in Chrome (Network.setBlockedURLs); scrapers only read DOM text and src attributes
+BLOCKED_RESOURCES = {
+    'images': extension_patterns("jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico"),
+    'fonts': extension_patterns("woff", "woff2", "ttf", "otf", "eot") + ["*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    'media': extension_patterns("mp4", "webm", "mp3", "m3u8"),
+    'trackers': ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+                 "*connect.facebook.net*", "*hotjar.com*", "*clarity.ms*", "*segment.io*", "*newrelic.com*", "*nr-data.net*"],
+}
+
+# Resource categories a site must still load
+SITE_ALLOWED_RESOURCES = {
+    "Vista": ["trackers"],  # Keep the page close to a normal visit while Cloudflare checks it
+}
+
+
+def load_page_byte_baselines():
+    try:
+        with open(PAGE_BYTES_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def start_chrome(driver_path):
+    """Start one headless Chrome with the scraper's options"""
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+    options.add_argument('--disable-features=VizDisplayCompositor')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    # Network events for per-page traffic accounting
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    
+    # Test the driver
+    driver.get("data:text/html,<html><body><h1>Test</h1></body></html>")
+    return driver
+
+
+class BrowserService:
+    """Process-wide pool of warm headless Chrome sessions.
+
+    Module state survives Streamlit reruns, so browsers released by one scrape
+    are handed to the next instead of cold-starting Chrome. The chromedriver
+    path is pinned (CHROMEDRIVER_PATH) or resolved once and cached on disk.
+    Browsers are health-checked on checkout and recycled after max_uses runs
+    or max_age seconds.
+    """
+
+    def __init__(self, max_idle=4, max_uses=25, max_age=1800):
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.idle = []  # [(driver, started_at, uses)]
+        self.in_use = {}  # id(driver) -> (started_at, uses)
+        self.starting = 0
+        self.driver_path = None
+
+    def resolve_driver_path(self):
+        """Pinned or cached chromedriver binary; webdriver-manager only runs when neither exists"""
+        with self.lock:
+            if self.driver_path and os.path.exists(self.driver_path):
+                return self.driver_path
+            path = os.environ.get("CHROMEDRIVER_PATH")
+            if not path:
+                try:
+                    with open(DRIVER_PATH_CACHE) as f:
+                        path = json.load(f).get("path")
+                except (OSError, ValueError):
+                    path = None
+            if not path or not os.path.exists(path):
+                # Use WebDriverManager to handle version matching
+                path = ChromeDriverManager().install()
+                try:
+                    os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+                    with open(DRIVER_PATH_CACHE, "w") as f:
+                        json.dump({"path": path, "resolved": datetime.now().isoformat()}, f)
+                except OSError:
+                    pass
+            self.driver_path = path
+            return path
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def is_expired(self, started_at, uses):
+        return uses >= self.max_uses or time.monotonic() - started_at >= self.max_age
+
+    def acquire(self):
+        """Hand out a healthy warm browser, starting a new one if none is idle.
+
+        Returns (driver, warm) where warm tells whether Chrome was already running.
+        """
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                driver, started_at, uses = self.idle.pop()
+            if self.is_expired(started_at, uses) or not self.is_healthy(driver):
+                self.quit(driver)
+                continue
+            with self.lock:
+                self.in_use[id(driver)] = (started_at, uses)
+            return driver, True
+
+        driver = start_chrome(self.resolve_driver_path())
+        with self.lock:
+            self.in_use[id(driver)] = (time.monotonic(), 0)
+        return driver, False
+
+    def release(self, driver):
+        """Return a browser after a run; it is kept warm unless it is due for recycling"""
+        with self.lock:
+            started_at, uses = self.in_use.pop(id(driver), (time.monotonic(), 0))
+        uses += 1
+        try:
+            driver.get("about:blank")
+        except Exception:
+            self.quit(driver)
+            return
+        with self.lock:
+            if not self.is_expired(started_at, uses) and len(self.idle) < self.max_idle:
+                self.idle.append((driver, started_at, uses))
+                return
+        self.quit(driver)
+
+    def discard(self, driver):
+        """Drop a crashed or still-busy browser instead of reusing it"""
+        with self.lock:
+            self.in_use.pop(id(driver), None)
+        self.quit(driver)
+
+    def quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm(self, count=1):
+        """Start browsers in the background until count exist (e.g. on app load)"""
+        def start():
+            try:
+                driver = start_chrome(self.resolve_driver_path())
+            except Exception:
+                traceback.print_exc()
+                return
+            finally:
+                with self.lock:
+                    self.starting -= 1
+            with self.lock:
+                if len(self.idle) < self.max_idle:
+                    self.idle.append((driver, time.monotonic(), 0))
+                    return
+            self.quit(driver)
+
+        with self.lock:
+            missing = max(0, count - len(self.idle) - len(self.in_use) - self.starting)
+            self.starting += missing
+        for _ in range(missing):
+            threading.Thread(target=start, daemon=True).start()
+
+
+BROWSER_SERVICE = BrowserService()
+
+
+class PriceCache:
+    """Gemini retail-price answers (JSON) kept on disk across runs.
+
+    Keyed by the normalized lot title plus a hash of the image bytes, so the
+    same lot re-scraped later (or identical lots in one catalog) costs no
+    Gemini request. Entries expire after ttl seconds; beyond max_rows the
+    least recently used are dropped.
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, max_rows=50000):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.db = None
+
+    def connect(self):
+        if self.db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS prices (key TEXT PRIMARY KEY, result TEXT, created REAL, used REAL)")
+            self.db.execute("DELETE FROM prices WHERE created < ?", (time.time() - self.ttl,))
+            self.db.commit()
+        return self.db
+
+    @staticmethod
+    def key(title, image_bytes):
+        normalized = re.sub(r"\W+", " ", title.lower()).strip()
+        return hashlib.sha256(f"{normalized}|{hashlib.sha256(image_bytes).hexdigest()}".encode()).hexdigest()
+
+    def get(self, key):
+        try:
+            with self.lock:
+                db = self.connect()
+                row = db.execute("SELECT result, created FROM prices WHERE key = ?", (key,)).fetchone()
+                if row is None or row[1] < time.time() - self.ttl:
+                    return None
+                db.execute("UPDATE prices SET used = ? WHERE key = ?", (time.time(), key))
+                db.commit()
+            return json.loads(row[0])
+        except ValueError:
+            return None  # Entry from an older format
+        except sqlite3.Error as e:
+            print(f"Price cache unavailable: {e}")
+            return None
+
+    def put(self, key, result):
+        now = time.time()
+        try:
+            with self.lock:
+                db = self.connect()
+                db.execute("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?)", (key, json.dumps(result), now, now))
+                db.execute("DELETE FROM prices WHERE key IN (SELECT key FROM prices ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_rows,))
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"Price cache unavailable: {e}")
+
+    def size(self):
+        try:
+            with self.lock:
+                return self.connect().execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+PRICE_CACHE = PriceCache(PRICE_CACHE_DB)
+
+# Leading bytes of each image format, and the formats Gemini accepts inline
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+GEMINI_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/heic", "image/heif"}
+
+
+def sniff_image_type(data):
+    """Mime type of image bytes from their magic number, or None"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        if brand in (b"heic", b"heix", b"heim", b"heis"):
+            return "image/heic"
+        if brand in (b"mif1", b"msf1"):
+            return "image/heif"
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+    for signature, mime in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    return None
+
+
+def prepare_image(data, max_edge=768, quality=80):
+    """(bytes, mime type) to send to Gemini for a downloaded lot image.
+
+    With Pillow installed the image is shrunk to max_edge pixels on its longest
+    side and re-encoded as JPEG (the original is kept when it is already
+    smaller); results are cached in AI_IMAGE_DIR by content hash. Without
+    Pillow the original bytes go out with their sniffed type. (None, None)
+    when the bytes are not an image Gemini can read.
+    """
+    mime = sniff_image_type(data)
+    if Image is None:
+        return (data, mime) if mime in GEMINI_IMAGE_TYPES else (None, None)
+
+    path = os.path.join(AI_IMAGE_DIR, f"{hashlib.sha256(data).hexdigest()}_{max_edge}_{quality}")
+    for ext, cached_mime in ((".jpg", "image/jpeg"), (".orig", mime)):
+        try:
+            with open(path + ext, "rb") as f:
+                return f.read(), cached_mime
+        except OSError:
+            pass
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.seek(0)  # First frame of animated GIF/WebP
+            resized = max(image.size) > max_edge
+            image.thumbnail((max_edge, max_edge))
+            if image.mode not in ("RGB", "L"):
+                # JPEG has no alpha: flatten transparent pixels onto white
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, "white")
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=quality, optimize=True)
+    except Exception as e:
+        print(f"Could not decode image ({e})")
+        return (data, mime) if mime in GEMINI_IMAGE_TYPES else (None, None)
+
+    processed, ext = (out.getvalue(), ".jpg")
+    if mime in GEMINI_IMAGE_TYPES and not resized and len(data) <= len(processed):
+        processed, ext = (data, ".orig")
+    try:
+        os.makedirs(AI_IMAGE_DIR, exist_ok=True)
+        with open(path + ext, "wb") as f:
+            f.write(processed)
+    except OSError as e:
+        print(f"Could not cache image: {e}")
+    return processed, ("image/jpeg" if ext == ".jpg" else mime)
+
+
+# Order of the AI pricing queue, so a run that runs out of Gemini quota has
+# priced the lots that matter most (see AuctionScraper.ai_priority_key)
+AI_PRIORITIES = {
+    "sold_price": "Highest sold price first",
+    "keywords": "Keyword matches first, then sold price",
+    "crawl_order": "Crawl order",
+}
+# Unpriced-lot reason for lots Gemini could not be asked about because of rate limits or quota
+AI_QUOTA_REASON = "AI quota exhausted / rate-limited"
+
+# Schema-constrained Gemini answer for one lot; batched requests return a list
+# of them tagged with the lot number. Checked again by validate_price_answer.
+PRICE_ANSWER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "price": {"type": "NUMBER", "description": "Retail price in USD"},
+        "url": {"type": "STRING", "description": "Direct retail product link, not an auction site"},
+        "confidence": {"type": "NUMBER", "minimum": 0, "maximum": 1,
+                       "description": "How sure you are the priced product is the lot's item, 0 to 1"},
+        "matched_product": {"type": "STRING", "description": "Name of the product that was priced"},
+    },
+    "required": ["price", "url", "confidence", "matched_product"],
+    "property_ordering": ["price", "url", "confidence", "matched_product"],
+}
+BATCH_PRICE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "lots": {
+            "type": "ARRAY",
+            "items": {
+                **PRICE_ANSWER_SCHEMA,
+                "properties": {"lot": {"type": "INTEGER", "description": "Lot number"}, **PRICE_ANSWER_SCHEMA["properties"]},
+                "required": ["lot", *PRICE_ANSWER_SCHEMA["required"]],
+                "property_ordering": ["lot", *PRICE_ANSWER_SCHEMA["property_ordering"]],
+            },
+        },
+    },
+    "required": ["lots"],
+}
+
+
+def validate_price_answer(answer):
+    """{'price', 'url', 'confidence', 'matched_product'} from one decoded Gemini
+    answer, or None if a field is missing, mistyped or out of range"""
+    if not isinstance(answer, dict):
+        return None
+    price, url, confidence, product = (answer.get(field) for field in ("price", "url", "confidence", "matched_product"))
+    numbers = (int, float)
+    if isinstance(price, bool) or not isinstance(price, numbers) or not math.isfinite(price) or price <= 0:
+        return None
+    if not isinstance(url, str) or not re.fullmatch(r"https?://[\w.-]+\.[a-z]{2,}(?:[/?#]\S*)?", url.strip(), re.I):
+        return None
+    if isinstance(confidence, bool) or not isinstance(confidence, numbers) or not 0 <= confidence <= 1:
+        return None
+    if not isinstance(product, str) or not product.strip():
+        return None
+    return {'price': round(float(price), 2), 'url': url.strip(), 'confidence': float(confidence), 'matched_product': product.strip()}
+
+
+class GeminiKeyPool:
+    """One Gemini client per API key, each behind its own token bucket.
+
+    Buckets refill at requests_per_minute / 60 tokens per second on the
+    monotonic clock and hold at most one token, so a key is paced evenly
+    within its quota. acquire() hands out the ready key with the most tokens
+    (fewest requests in flight on a tie), so concurrent lookups spread over
+    all keys. A rate-limited key is parked until its window resets, which
+    does not count as a failure; it is dropped as exhausted once its daily
+    quota runs out or it is still rate-limited max_rate_limits times in a row.
+    A key whose requests fail with other errors max_failures times in a row
+    is dropped too.
+    """
+
+    def __init__(self, clients, requests_per_minute=10, max_failures=3, max_rate_limits=3):
+        self.rate = requests_per_minute / 60
+        self.max_failures = max_failures
+        self.max_rate_limits = max_rate_limits
+        now = time.monotonic()
+        self.slots = [{'number': number, 'client': client, 'tokens': 1.0, 'updated': now, 'parked_until': 0,
+                       'in_flight': 0, 'failures': 0, 'limited_in_row': 0, 'disabled': False, 'exhausted': False,
+                       'requests': 0, 'rate_limited': 0}
+                      for number, client in clients]
+        self.cond = threading.Condition()
+
+    def healthy(self):
+        with self.cond:
+            return sum(not slot['disabled'] for slot in self.slots)
+
+    def exhausted(self):
+        """True once every key has been dropped for running out of quota"""
+        with self.cond:
+            return all(slot['exhausted'] for slot in self.slots)
+
+    def acquire(self, keep_waiting=lambda: True, on_wait=None):
+        """Slot of the next key allowed to send a request, waiting for one to
+        refill; None when every key is disabled or keep_waiting() turns false"""
+        with self.cond:
+            notified = False
+            while keep_waiting():
+                now = time.monotonic()
+                ready, wait = [], None
+                for slot in self.slots:
+                    if slot['disabled']:
+                        continue
+                    slot['tokens'] = min(1.0, slot['tokens'] + (now - slot['updated']) * self.rate)
+                    slot['updated'] = now
+                    if slot['parked_until'] > now:
+                        until_free = slot['parked_until'] - now
+                    elif slot['tokens'] >= 1:
+                        ready.append(slot)
+                        continue
+                    else:
+                        until_free = (1 - slot['tokens']) / self.rate
+                    wait = until_free if wait is None else min(wait, until_free)
+                if ready:
+                    slot = max(ready, key=lambda slot: (slot['tokens'], -slot['in_flight']))
+                    slot['tokens'] -= 1
+                    slot['in_flight'] += 1
+                    slot['requests'] += 1
+                    return slot
+                if wait is None:
+                    return None
+                if on_wait and not notified and wait >= 1:
+                    on_wait(wait)
+                    notified = True
+                self.cond.wait(min(wait, 1))
+            return None
+
+    def release(self, slot, ok=True):
+        """Return a key after its request; count a failure unless ok"""
+        with self.cond:
+            slot['in_flight'] -= 1
+            slot['failures'] = 0 if ok else slot['failures'] + 1
+            slot['limited_in_row'] = 0
+            if slot['failures'] >= self.max_failures:
+                slot['disabled'] = True
+            self.cond.notify_all()
+
+    def park(self, slot, seconds, daily=False):
+        """Rest a rate-limited key until its quota window resets (not a failure),
+        or drop it as exhausted after a daily limit or max_rate_limits in a row"""
+        with self.cond:
+            slot['parked_until'] = time.monotonic() + seconds
+            slot['tokens'] = 0.0
+            slot['rate_limited'] += 1
+            slot['limited_in_row'] += 1
+            slot['in_flight'] -= 1
+            if daily or slot['limited_in_row'] >= self.max_rate_limits:
+                slot['disabled'] = slot['exhausted'] = True
+            self.cond.notify_all()
+
+
+def prune_image_cache(max_age):
+    """Delete cached Gemini images not written in max_age seconds"""
+    cutoff = time.time() - max_age
+    try:
+        for entry in os.scandir(AI_IMAGE_DIR):
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+    except OSError:
+        pass
+
+
 class AuctionScraper:
-    def __init__(self, gemini_api_keys, ui_placeholders):
+    def __init__(self, gemini_api_keys, ui_placeholders, settings=None):
         self.running = True
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -34,193 +1207,1011 @@ class AuctionScraper:
         self.percentages = []
         self.ui = ui_placeholders
         self.gemini_api_keys = [key for key in gemini_api_keys if key]
-        self.current_api_key_index = 0
-        self.gemini_client = None
+        self.gemini = None  # GeminiKeyPool over all working keys
+        self.ai_disabled_reason = "AI disabled"  # Unpriced-lot reason once self.gemini is None
         self.driver = None
         
+        # Chrome pool for sites that load pages in parallel
+        self.driver_pool_size = 2  # Browsers per run (each costs ~300MB RAM)
+        self.drivers = []
+        self.idle_drivers = queue.Queue()
+        self.drivers_lock = threading.Lock()
+        
+        # Page readiness waits (replace fixed sleeps)
+        self.ready_quiet_ms = 500  # DOM/network silence that counts as "loaded"
+        self.ready_timeout = 15  # Upper bound for one readiness wait, seconds
+        self.end_of_results_timeout = 15  # Fallback when a page shows neither lots nor an end marker
+        self.scroll_idle_timeout = 3  # Infinite scroll ends after this long without new lots or a spinner
+        self.block_resources = True  # Block images, fonts, media and trackers in Chrome
+        self.capture_api = False  # Read lots from the JSON responses behind SPA pages (API_LOT_FIELDS)
+        self.listing_only = False  # Take prices from listing cards; fetch lot pages only for incomplete cards
+        self.ai_image_max_edge = 768  # Longest side (px) of images sent to Gemini; larger images are downscaled
+        self.ai_image_quality = 80  # JPEG quality of downscaled images
+        self.site = None
+        
         # Rate limiting variables
-        self.request_times = []  # Track request timestamps
-        self.max_requests_per_minute = 10  # Gemini free tier limit
+        self.max_requests_per_minute = 10  # Gemini free tier limit, per API key
+        
+        # Concurrent detail fetching
+        self.max_workers_per_host = 8  # Parallel requests allowed against one site
+        self.max_detail_workers = 16  # Total detail fetch threads
+        self.page_window = 4  # Numbered listing pages fetched in parallel
+        self.host_slots = {}
+        self.host_slots_lock = threading.Lock()
+        self.ui_events = queue.Queue()  # Status messages posted from worker threads
+        self.parse_processes = 0  # Worker processes parsing lot pages (0 = parse in the fetch threads)
+        self.ai_workers = 0  # Threads pricing lots with Gemini while the crawl goes on (0 = one per API key)
+        self.ai_batch_size = 4  # Lots priced together in one Gemini request (1 = one request per lot)
+        self.ai_priority = "sold_price"  # Which queued lots get Gemini quota first (AI_PRIORITIES)
+        self.ai_priority_keywords = ""  # Comma-separated words matched in title/category for "keywords"
+        self.ai_queue = queue.PriorityQueue()  # (priority key, sequence, lot) waiting for a retail price
+        self.ai_sequence = itertools.count()  # Ties keep crawl order
+        self.ai_results = queue.Queue()  # (lot, retail price result, reason if None) for the Streamlit thread
+        self.ai_threads = []
+        self.ai_counts = {'queued': 0, 'done': 0}
+        self.unpriced_lots = []  # Lots the AI stage left without a retail price, with the reason
+        self.ai_stop_reason = None  # Set when the AI stage is shut down; ends rate-limit waits
+        self.parse_pool = None
+        self.parse_pool_lock = threading.Lock()
+        
+        # Pooled keep-alive HTTP sessions, one per host
+        self.pool_connections = 4  # Connection pools cached per session
+        self.pool_maxsize = 16  # Keep-alive connections kept per host
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        
+        # Run stats shown in the UI after a scrape
+        self.stats = {'started': time.monotonic(), 'http': {}, 'waits': {}, 'crawl_end': None,
+                      'browser_start': [], 'browsers_warm': 0, 'traffic': {},
+                      'extraction': {}, 'api': {}, 'handoff': {}, 'parse': {}, 'structured': {}, 'listing': {}, 'price_cache': {'hits': 0, 'misses': 0},
+                      'images': {'count': 0, 'downloaded': 0, 'sent': 0},
+                      'ai_batches': {'requests': 0, 'lots': 0, 'retried': 0},
+                      'ai_answers': {'valid': 0, 'invalid': 0}}
+        self.stats_lock = threading.Lock()
+        
+        # Override tunables from the UI (only known attributes)
+        for name, value in (settings or {}).items():
+            if hasattr(self, name):
+                setattr(self, name, value)
         
         if self.gemini_api_keys:
             self.setup_gemini()
+            prune_image_cache(PRICE_CACHE.ttl)
+
+    def stop(self):
+        self.running = False
+        self.quit_drivers(reuse=False)
+        self.close_sessions()
+        self.close_parse_pool()
+
+    def create_driver(self):
+        """Take a browser from the warm browser service"""
+        started = time.monotonic()
+        driver, warm = BROWSER_SERVICE.acquire()
+        driver.set_script_timeout(self.ready_timeout + 5)
+        self.apply_resource_policy(driver)
+        with self.stats_lock:
+            self.stats['browser_start'].append(time.monotonic() - started)
+            self.stats['browsers_warm'] += int(warm)
+        return driver
+
+    def blocked_url_patterns(self):
+        """URL patterns to block for the current site, minus its allow-list"""
+        if not self.block_resources:
+            return []
+        allowed = SITE_ALLOWED_RESOURCES.get(self.site, [])
+        return [pattern for category, patterns in BLOCKED_RESOURCES.items() if category not in allowed for pattern in patterns]
+
+    def apply_resource_policy(self, driver):
+        """Install this run's blocking policy (warm browsers keep the previous run's otherwise)"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns()})
+            driver.get_log('performance')  # Drop events from before this run
+        except Exception as e:
+            self.post_status('warning', f"Could not set resource blocking: {e}")
+
+    def read_network_log(self, driver, label):
+        """Drain Chrome's network log and tally bytes received and requests blocked for one page"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return []
+        messages = []
+        received = blocked = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') == 'Network.loadingFinished':
+                received += message['params'].get('encodedDataLength', 0)
+            elif message.get('method') == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+                blocked += 1
+            messages.append(message)
+        with self.stats_lock:
+            self.stats['traffic'].setdefault(label, []).append((received, blocked))
+        return messages
+
+    def save_traffic_baseline(self):
+        """Remember bytes/page of unblocked runs so blocked runs can report what they saved"""
+        if self.block_resources or not self.stats['traffic']:
+            return
+        baselines = load_page_byte_baselines()
+        for label, pages in self.stats['traffic'].items():
+            baselines[label] = statistics.mean(received for received, _ in pages)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(PAGE_BYTES_CACHE, "w") as f:
+                json.dump(baselines, f)
+        except OSError:
+            pass
+
+    def capture_api_lots(self, driver, site, messages):
+        """Lot cards parsed from the JSON responses seen in messages (from read_network_log).
+
+        Bodies are fetched with Network.getResponseBody; the endpoint that
+        yielded the most lots wins and is recorded for the run stats.
+        """
+        by_endpoint = {}
+        requests_seen = {}
+        for message in messages:
+            params = message.get('params', {})
+            if message.get('method') == 'Network.requestWillBeSent':
+                requests_seen[params.get('requestId')] = params.get('request', {}).get('method', 'GET')
+                continue
+            if message.get('method') != 'Network.responseReceived' or params.get('type') not in ('XHR', 'Fetch'):
+                continue
+            response = params.get('response', {})
+            if 'json' not in response.get('mimeType', ''):
+                continue
+            try:
+                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                payload = json.loads(base64.b64decode(body['body']) if body.get('base64Encoded') else body['body'])
+            except WebDriverException as e:
+                if is_driver_crash(e):
+                    raise
+                continue  # Body already evicted or never buffered
+            except (KeyError, ValueError):
+                continue
+            cards = find_api_lots(payload, API_LOT_FIELDS[site])
+            if cards:
+                endpoint = f"{requests_seen.get(params['requestId'], 'GET')} {response.get('url', '').split('?')[0]}"
+                by_endpoint.setdefault(endpoint, []).extend(cards)
+        if not by_endpoint:
+            return []
+        endpoint, cards = max(by_endpoint.items(), key=lambda item: len(item[1]))
+        with self.stats_lock:
+            captured = self.stats['api'].setdefault(site, {'endpoint': endpoint, 'lots': 0})
+            captured['endpoint'] = endpoint
+            captured['lots'] += len(cards)
+        return cards
+
+    def extract_lots(self, driver, site, messages=None):
+        """Raw lot cards of the current page via the site's in-browser script (one round trip).
+
+        With capture_api on, the lot JSON in messages (from read_network_log) is
+        tried first. Falls back to parsing page_source with the matching
+        CARD_PARSERS entry when the script fails or finds nothing.
+        """
+        cards = None
+        if self.capture_api and messages and site in API_LOT_FIELDS:
+            cards = self.capture_api_lots(driver, site, messages)
+        method = 'api'
+        if not cards:
+            try:
+                cards = driver.execute_script(EXTRACT_SCRIPTS[site])
+            except WebDriverException as e:
+                if is_driver_crash(e):
+                    raise
+                cards = None
+            found = cards.get('lots') if isinstance(cards, dict) else cards
+            method = 'script' if found else 'page_source'
+            if not found:
+                cards = CARD_PARSERS[site](make_soup(driver.page_source, site))
+        self.record_extraction(site, method)
+        return cards
+
+    def record_extraction(self, site, method):
+        with self.stats_lock:
+            counts = self.stats['extraction'].setdefault(site, {'api': 0, 'script': 0, 'page_source': 0})
+            counts[method] += 1
+
+    def first_element(self, driver, css_selector):
+        """First element matching css_selector on the current page, or None"""
+        elements = driver.find_elements(By.CSS_SELECTOR, css_selector)
+        return elements[0] if elements else None
+
+    def wait_until_ready(self, driver, label, previous=None, timeout=None):
+        """Wait for concrete page-ready signals instead of a fixed sleep.
+
+        If previous (an element of the page being left) is given, first wait for
+        it to go stale, then until the DOM and network have been quiet for
+        ready_quiet_ms. The time actually waited is recorded under label.
+        """
+        timeout = timeout or self.ready_timeout
+        started = time.monotonic()
+        signal = 'quiet'
+        if previous is not None:
+            try:
+                WebDriverWait(driver, timeout).until(EC.staleness_of(previous))
+            except TimeoutException:
+                signal = 'not stale'
+        remaining = max(0.5, timeout - (time.monotonic() - started))
+        try:
+            result = driver.execute_async_script(PAGE_READY_SCRIPT, self.ready_quiet_ms, int(remaining * 1000))
+        except TimeoutException:
+            result = 'timeout'
+        if signal == 'quiet':
+            signal = result
+        self.record_wait(label, time.monotonic() - started)
+        return signal
+
+    def wait_for_cloudflare(self, driver, label, timeout=25):
+        """Wait until the Cloudflare interstitial is gone; returns False if it never cleared"""
+        started = time.monotonic()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.5).until(
+                lambda d: not any(marker in d.page_source for marker in CLOUDFLARE_MARKERS)
+            )
+            cleared = True
+        except TimeoutException:
+            cleared = False
+        self.record_wait(label, time.monotonic() - started)
+        return cleared
+
+    def wait_for_lots(self, driver, site, lot_selector):
+        """Wait until lots render or the page shows the catalog has ended.
+
+        Returns None when lots are present, otherwise an EndOfCatalog naming the
+        empty-state marker or zero result count seen in the results container
+        (or the fallback timeout if nothing conclusive appeared).
+        """
+        started = time.monotonic()
+        containers = END_OF_RESULTS_CONTAINERS.get(site, ["main"])
+        try:
+            state = WebDriverWait(driver, self.end_of_results_timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(END_OF_RESULTS_SCRIPT, lot_selector, END_OF_RESULTS_PHRASES.get(site, []), containers, self.ready_quiet_ms)
+            )
+        except TimeoutException:
+            state = f"no lots after {self.end_of_results_timeout}s"
+        self.record_wait(f"{site} lots", time.monotonic() - started)
+        return None if state == 'lots' else EndOfCatalog(state)
+
+    def end_crawl(self, reason):
+        """Remember why the crawl stopped (first reason wins)"""
+        with self.stats_lock:
+            if not self.stats['crawl_end']:
+                self.stats['crawl_end'] = reason
+
+    def record_wait(self, label, seconds):
+        with self.stats_lock:
+            self.stats['waits'].setdefault(label, []).append(seconds)
+
+    def setup_driver(self, pool_size=1):
+        """Setup the Chrome pool; self.driver is the first browser for single-tab scrapers"""
+        try:
+            pool_size = max(1, pool_size)
+            with ThreadPoolExecutor(max_workers=pool_size) as pool:
+                futures = [pool.submit(self.create_driver) for _ in range(pool_size)]
+            
+            errors = []
+            for future in futures:
+                try:
+                    driver = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                self.drivers.append(driver)
+                self.idle_drivers.put(driver)
+            
+            if not self.drivers:
+                raise errors[0]
+            if errors:
+                self.ui['status'].warning(f"Started {len(self.drivers)} of {pool_size} browsers: {errors[0]}")
+            self.driver = self.drivers[0]
+            
+        except Exception as e:
+            self.ui['status'].error(f"Failed to setup ChromeDriver: {e}")
+            raise
+
+    def checkout_driver(self):
+        """Take an idle browser from the pool, waiting while all are busy"""
+        while self.running:
+            if not self.drivers:
+                raise RuntimeError("No browsers left in the pool")
+            try:
+                return self.idle_drivers.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        raise RuntimeError("Scraper stopped")
+
+    def replace_driver(self, driver):
+        """Discard a crashed browser and start a fresh one in its place"""
+        BROWSER_SERVICE.discard(driver)
+        with self.drivers_lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        new_driver = self.create_driver()
+        with self.drivers_lock:
+            self.drivers.append(new_driver)
+            if self.driver is driver:
+                self.driver = new_driver
+        return new_driver
+
+    def with_driver(self, task):
+        """Run task(driver) on a pooled browser, restarting Chrome and retrying once if it crashed"""
+        for attempt in range(2):
+            driver = self.checkout_driver()
+            try:
+                result = task(driver)
+            except WebDriverException as e:
+                if not is_driver_crash(e) or not self.running:
+                    self.idle_drivers.put(driver)
+                    raise
+                self.post_status('warning', f"Browser crashed ({str(e).splitlines()[0]}), restarting it...")
+                self.idle_drivers.put(self.replace_driver(driver))
+                if attempt:
+                    raise
+                continue
+            self.idle_drivers.put(driver)
+            return result
+
+    def quit_drivers(self, reuse=True):
+        """Hand idle browsers back to the warm service; busy ones (or all, if not reuse) are discarded"""
+        with self.drivers_lock:
+            drivers = list(self.drivers)
+            self.drivers = []
+        idle = set()
+        while True:
+            try:
+                idle.add(id(self.idle_drivers.get_nowait()))
+            except queue.Empty:
+                break
+        for driver in drivers:
+            if reuse and id(driver) in idle:
+                BROWSER_SERVICE.release(driver)
+            else:
+                BROWSER_SERVICE.discard(driver)
+        self.driver = None
+
+    def setup_gemini(self):
+        try:
+            if not self.gemini_api_keys:
+                self.ui['status'].warning("No Gemini API keys found.")
+                return
+
+            clients = []
+            for number, api_key in enumerate(self.gemini_api_keys, start=1):
+                try:
+                    clients.append((number, genai.Client(api_key=api_key)))
+                except Exception as e:
+                    self.ui['status'].warning(f"Skipping Gemini API Key {number}: {e}")
+            if clients:
+                self.gemini = GeminiKeyPool(clients, self.max_requests_per_minute)
+                self.ui['status'].info(f"AI price lookup enabled with {len(clients)} Gemini API key(s), "
+                                       f"{len(clients) * self.max_requests_per_minute} requests/minute")
+
+        except Exception as e:
+            self.ui['status'].error(f"An unexpected error occurred setting up Gemini AI: {e}.")
+            self.gemini = None
+            traceback.print_exc()
+
+    def load_lot_image(self, product_name, image_url):
+        """{'cache_key', 'cached'} for a cached lot, {'cache_key', 'mime_type', 'data'}
+        for one to send to Gemini, or None when its image can't be used"""
+        try:
+            # Closing the streamed response hands its connection back to the host's pool
+            with self.http_get(image_url, stream=True, timeout=15) as response:
+                if response.status_code != 200:
+                    print(f"Failed to download image: {image_url}")
+                    return None
+                image_bytes = response.content
+        except requests.RequestException as e:
+            print(f"Failed to download image: {image_url} ({e})")
+            return None
+        
+        cache_key = PRICE_CACHE.key(product_name, image_bytes)
+        cached = validate_price_answer(PRICE_CACHE.get(cache_key))
+        self.record_price_lookup(cached is not None)
+        if cached is not None:
+            return {'cache_key': cache_key, 'cached': cached}
+        
+        image_data, mime_type = prepare_image(image_bytes, self.ai_image_max_edge, self.ai_image_quality)
+        if image_data is None:
+            print(f"Unsupported image for AI lookup: {image_url}")
+            return None
+        with self.stats_lock:
+            self.stats['images']['count'] += 1
+            self.stats['images']['downloaded'] += len(image_bytes)
+            self.stats['images']['sent'] += len(image_data)
+        return {'cache_key': cache_key, 'mime_type': mime_type, 'data': image_data}
+
+    def ask_gemini(self, parts, schema, parse):
+        """(parse(decoded JSON reply), None) of a schema-constrained request with the
+        given parts, sent on the next free API key. API errors move on to another
+        key; a reply that fails parse comes back as (None, None) without a retry,
+        and (None, failure) means no key gave a reply at all"""
+        gemini = self.gemini
+        if not gemini:
+            return None, self.unpriced_reason()
+        failure = None
+        
+        # Proper content structure with roles
+        contents = [{"role": "user", "parts": parts}]
+        config = types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+        
+        def report_wait(seconds):
+            self.post_status('info', f"All Gemini keys at their rate limit. Waiting {seconds:.0f} seconds...")
+        
+        for attempt in range(len(self.gemini_api_keys) * (gemini.max_failures + gemini.max_rate_limits)):
+            slot = gemini.acquire(self.ai_active, report_wait)
+            if slot is None:
+                break
+            try:
+                response = slot['client'].models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=config
+                )
+            except Exception as e:
+                error_str = str(e)
+                
+                # 429: park this key until its quota window resets, retry on another;
+                # a per-day quota (quotaId "...PerDay...") won't reset during the run
+                if "429" in error_str and "RESOURCE_EXHAUSTED" in error_str:
+                    retry_delay = re.search(r"retryDelay'?\"?:\s*'?\"?(\d+)", error_str)
+                    seconds = int(retry_delay.group(1)) if retry_delay else 60
+                    gemini.park(slot, seconds, daily="PerDay" in error_str)
+                    if slot['exhausted']:
+                        self.post_status('warning', f"Dropping Gemini API Key {slot['number']}: its quota is exhausted.")
+                    else:
+                        self.post_status('warning', f"Gemini API Key {slot['number']} hit its rate limit; resting it for {seconds}s")
+                    failure = AI_QUOTA_REASON
+                    continue
+                
+                print("\n--- ERROR IN ask_gemini ---")
+                traceback.print_exc()
+                print("---------------------------\n")
+                gemini.release(slot, ok=False)
+                if slot['disabled']:
+                    self.post_status('warning', f"Dropping Gemini API Key {slot['number']} after {gemini.max_failures} failures in a row.")
+                failure = "AI API error"
+                continue
+            
+            # The key worked; a bad answer is the model's and asking again costs quota
+            gemini.release(slot)
+            try:
+                result = parse(json.loads(response.text))
+            except (TypeError, ValueError):
+                result = None
+            with self.stats_lock:
+                self.stats['ai_answers']['valid' if result else 'invalid'] += 1
+            if not result:
+                print(f"AI response invalid: {response.text}")
+            return result, None
+        
+        if self.ai_active() and not gemini.healthy() and self.gemini is gemini:
+            if gemini.exhausted():
+                self.post_status('error', "All Gemini API keys are out of quota. Disabling AI for this session.")
+            else:
+                self.post_status('error', "All Gemini API keys failed. Disabling AI for this session.")
+            self.gemini = None
+            self.ai_disabled_reason = AI_QUOTA_REASON if gemini.exhausted() else "AI disabled (API keys failed)"
+        if not self.ai_active():
+            return None, self.unpriced_reason()
+        # No attempt made: every key was dropped while this lookup waited for one
+        return None, failure or (AI_QUOTA_REASON if gemini.exhausted() else "AI disabled (API keys failed)")
+
+    def get_retail_price(self, product_name, image_url, image=None):
+        """(retail price result, None), or (None, reason the lot has none)"""
+        if not self.gemini:
+            return None, self.unpriced_reason()
+        image = image or self.load_lot_image(product_name, image_url)
+        if image is None:
+            return None, "image unavailable"
+        if 'cached' in image:
+            return image['cached'], None
+            
+        prompt_text = f"""
+        **Task**: Find the retail price and a direct product link for the item in the image, described as '{product_name}'.
+        **Rules**:
+        1. If you cannot find the exact item, find the CLOSEST SIMILAR item from a major retailer (Amazon, Walmart, etc.). NEVER return "NONE" or "Not Found".
+        2. `price` is the retail price in USD as a number (e.g., `123.45`).
+        3. `url` must be a direct retail link, not an auction site.
+        4. `matched_product` names the product you priced; `confidence` (0 to 1) is how sure you are it is the item in the image.
+        """
+        
+        result, failure = self.ask_gemini([
+            {"text": prompt_text},
+            {"inline_data": {"mime_type": image['mime_type'], "data": image['data']}}
+        ], PRICE_ANSWER_SCHEMA, validate_price_answer)
+        if not result:
+            return None, failure or "no valid AI answer"
+        PRICE_CACHE.put(image['cache_key'], result)
+        return result, None
+
+    def get_retail_prices(self, lots):
+        """(retail price result, None) or (None, reason it has none) for several
+        lots ({'title', 'image_url'}), in order.
+
+        Uncached lots are priced together in one Gemini request (titles and
+        images numbered 1..n, one answer per lot number back); any lot missing
+        from the reply or failing validation is looked up on its own. When the
+        request gets no reply at all, no lot is retried: that would only spend
+        more quota on keys that are failing.
+        """
+        if not self.gemini:
+            return [(None, self.unpriced_reason())] * len(lots)
+        images = [self.load_lot_image(lot['title'], lot['image_url']) for lot in lots]
+        results = [(None, "image unavailable") if image is None else (image['cached'], None) if 'cached' in image else None
+                   for image in images]
+        pending = [i for i, image in enumerate(images) if image and 'cached' not in image]
+        
+        def price_alone(i):
+            return self.get_retail_price(lots[i]['title'], lots[i]['image_url'], images[i])
+        
+        if len(pending) < 2:
+            for i in pending:
+                results[i] = price_alone(i)
+            return results
+        
+        prompt_text = f"""
+        **Task**: Below are {len(pending)} numbered auction lots, each a title followed by its image. For EVERY lot, find the retail price and a direct product link.
+        **Rules**:
+        1. Give one entry in `lots` per lot, with `lot` set to its number.
+        2. If you cannot find the exact item, find the CLOSEST SIMILAR item from a major retailer (Amazon, Walmart, etc.). NEVER return "NONE" or "Not Found".
+        3. `price` is the retail price in USD as a number (e.g., `123.45`).
+        4. `url` must be a direct retail link, not an auction site.
+        5. `matched_product` names the product you priced; `confidence` (0 to 1) is how sure you are it is the lot's item.
+        """
+        parts = [{"text": prompt_text}]
+        for number, i in enumerate(pending, start=1):
+            parts.append({"text": f"Lot {number}: '{lots[i]['title']}'"})
+            parts.append({"inline_data": {"mime_type": images[i]['mime_type'], "data": images[i]['data']}})
+        
+        def parse(reply):
+            answers = {}
+            entries = reply.get('lots') if isinstance(reply, dict) else None
+            for entry in entries if isinstance(entries, list) else []:
+                number = entry.get('lot') if isinstance(entry, dict) else None
+                answer = validate_price_answer(entry)
+                if type(number) is int and 1 <= number <= len(pending) and answer:
+                    answers[number] = answer
+            return answers
+        
+        answers, failure = self.ask_gemini(parts, BATCH_PRICE_SCHEMA, parse)
+        answers = answers or {}
+        for number, i in enumerate(pending, start=1):
+            if number in answers:
+                results[i] = (answers[number], None)
+                PRICE_CACHE.put(images[i]['cache_key'], answers[number])
+            elif failure:
+                results[i] = (None, failure)
+        retried = [] if failure else [i for number, i in enumerate(pending, start=1) if number not in answers]
+        with self.stats_lock:
+            batches = self.stats['ai_batches']
+            batches['requests'] += 1
+            batches['lots'] += len(pending)
+            batches['retried'] += len(retried)
+        for i in retried:
+            results[i] = price_alone(i) if self.ai_active() else (None, self.unpriced_reason())
+        return results
+
+    def unpriced_reason(self):
+        """Why a lot can't be priced now that the run or Gemini is off"""
+        if not self.ai_active():
+            return self.ai_stop_reason or "run stopped"
+        return self.ai_disabled_reason
+
+    def record_price_lookup(self, hit):
+        """Count a price-cache hit or miss"""
+        with self.stats_lock:
+            self.stats['price_cache']['hits' if hit else 'misses'] += 1
+
+    def get_session(self, url):
+        """Shared keep-alive session for the host of url"""
+        host = urlparse(url).netloc
+        with self.sessions_lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=max(self.pool_maxsize, self.max_workers_per_host)
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.sessions[host] = session
+            return session
+
+    def http_get(self, url, **kwargs):
+        """GET through the pooled session of the url's host"""
+        kwargs.setdefault('timeout', 30)
+        return self.get_session(url).get(url, **kwargs)
+
+    def connection_stats(self):
+        """Requests sent and TCP connections opened per host, read from the urllib3 pools"""
+        stats = {}
+        with self.sessions_lock:
+            sessions = list(self.sessions.items())
+        for host, session in sessions:
+            adapter = session.get_adapter(f"https://{host}")
+            pools = adapter.poolmanager.pools
+            counts = {'requests': 0, 'connections': 0}
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    counts['requests'] += pool.num_requests
+                    counts['connections'] += pool.num_connections
+            stats[host] = counts
+        return stats
+
+    def close_sessions(self):
+        """Record connection counters and close all pooled sessions"""
+        self.stats['http'].update(self.connection_stats())
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+            self.sessions = {}
+        for session in sessions:
+            session.close()
+
+    def get_run_stats(self):
+        """Flat {metric: value} summary of the last run for the UI"""
+        summary = {"Run Time": f"{time.monotonic() - self.stats['started']:.1f}s"}
+        if self.stats['crawl_end']:
+            summary["Crawl Ended"] = self.stats['crawl_end']
+        baselines = load_page_byte_baselines() if self.stats['traffic'] else {}
+        for label, pages in sorted(self.stats['traffic'].items()):
+            avg_received = statistics.mean(received for received, _ in pages)
+            avg_blocked = statistics.mean(blocked for _, blocked in pages)
+            traffic = f"{len(pages)} pages, avg {avg_received / 1024:,.0f} KB received, {avg_blocked:.0f} requests blocked"
+            if self.block_resources and label in baselines:
+                traffic += f", ~{(baselines[label] - avg_received) / 1024:,.0f} KB saved per page"
+            summary[f"Page Traffic ({label})"] = traffic
+        for site, counts in sorted(self.stats['extraction'].items()):
+            summary[f"Extraction ({site})"] = f"{counts['api']} pages from JSON, {counts['script']} in-browser, {counts['page_source']} via page_source"
+        for label, counts in sorted(self.stats['handoff'].items()):
+            handoff = f"{counts['http']} pages over HTTP, {counts['browser']} in browser"
+            if counts['clearances']:
+                handoff += f", {counts['clearances']} Cloudflare clearances"
+            summary[f"Browser Handoff ({label})"] = handoff
+        for site, captured in sorted(self.stats['api'].items()):
+            summary[f"Lot API ({site})"] = f"{captured['endpoint']} ({captured['lots']} lots)"
+        if self.stats['browser_start']:
+            summary["Browser Startup"] = f"{len(self.stats['browser_start'])} browsers ({self.stats['browsers_warm']} warm), slowest {max(self.stats['browser_start']):.2f}s"
+        for host, counts in sorted(self.stats['http'].items()):
+            summary[f"HTTP Requests ({host})"] = counts['requests']
+            summary[f"HTTP Connections ({host})"] = counts['connections']
+        if self.gemini:
+            for slot in self.gemini.slots:
+                state = " (dropped)" if slot['disabled'] else ""
+                summary[f"Gemini Key {slot['number']}"] = f"{slot['requests']} requests, {slot['rate_limited']} rate-limited{state}"
+        lookups = self.stats['price_cache']['hits'] + self.stats['price_cache']['misses']
+        if lookups:
+            summary["Gemini Price Cache"] = (f"{self.stats['price_cache']['hits']} of {lookups} lookups cached "
+                                             f"({self.stats['price_cache']['hits'] / lookups:.0%}), {PRICE_CACHE.size():,} prices stored")
+        if self.unpriced_lots:
+            reasons = Counter(lot['Reason'] for lot in self.unpriced_lots)
+            summary["AI Unpriced Lots"] = (f"{len(self.unpriced_lots)} of {self.ai_counts['queued']} ("
+                                           + ", ".join(f"{count} {reason}" for reason, count in reasons.most_common())
+                                           + f"), queue order: {AI_PRIORITIES.get(self.ai_priority, self.ai_priority).lower()}")
+        answers = self.stats['ai_answers']
+        if answers['valid'] + answers['invalid']:
+            summary["Gemini Answers"] = f"{answers['valid']} valid, {answers['invalid']} rejected by the validator (not retried)"
+        batches = self.stats['ai_batches']
+        if batches['requests']:
+            summary["Gemini Batches"] = (f"{batches['requests']} requests for {batches['lots']} lots "
+                                         f"(avg {batches['lots'] / batches['requests']:.1f}), {batches['retried']} lots retried singly")
+        images = self.stats['images']
+        if images['count']:
+            summary["Gemini Images"] = (f"{images['count']} sent, avg {images['downloaded'] / images['count'] / 1024:,.0f} KB downloaded, "
+                                        f"{images['sent'] / images['count'] / 1024:,.0f} KB uploaded")
+        for site, counts in sorted(self.stats['listing'].items()):
+            summary[f"Listing-only ({site})"] = (f"{counts['cards']} of {counts['cards'] + counts['details']} lots from listing cards, "
+                                                 f"{counts['cards']} detail requests avoided")
+        for site, sources in sorted(self.stats['structured'].items()):
+            pages = sum(sources.values())
+            summary[f"Embedded JSON ({site})"] = (f"{sources['json']}/{pages} lots ({sources['json'] / pages:.0%}), "
+                                                  f"{sources['html']} from HTML, {sources['none']} without prices")
+        for parser, seconds in sorted(self.stats['parse'].items()):
+            where = f"{self.parse_processes} processes" if self.parse_processes > 0 else "fetch threads"
+            summary[f"Parsing ({parser})"] = f"{len(seconds)} pages in {where}, avg {statistics.mean(seconds) * 1000:.0f} ms CPU, total {sum(seconds):.1f}s"
+        for label, waits in sorted(self.stats['waits'].items()):
+            summary[f"Waits ({label})"] = f"{len(waits)} waits, avg {statistics.mean(waits):.2f}s, max {max(waits):.2f}s, total {sum(waits):.1f}s"
+        return summary
+
+    def browser_session(self, driver, session=None):
+        """HTTP session carrying the browser's cookies and user agent.
+
+        Fills session if given (e.g. a pooled one from get_session). New sessions
+        use curl_cffi's Chrome impersonation when installed so the TLS
+        fingerprint matches the browser that earned the cookies (Cloudflare's
+        cf_clearance is bound to it); plain requests otherwise.
+        """
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        if session is None and curl_requests is not None:
+            session = curl_requests.Session(impersonate="chrome")
+        elif session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=max(self.pool_maxsize, self.max_workers_per_host)
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        session.headers['User-Agent'] = user_agent
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        return session
+
+    def record_listing(self, site, from_card):
+        """Count a lot taken from its listing card (a detail request avoided) or fetched in detail"""
+        with self.stats_lock:
+            counts = self.stats['listing'].setdefault(site, {'cards': 0, 'details': 0})
+            counts['cards' if from_card else 'details'] += 1
 
-    def stop(self):
-        self.running = False
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+    def record_handoff(self, label, kind):
+        """Count a page fetched over HTTP ('http'), in the browser ('browser') or a re-clearance ('clearances')"""
+        with self.stats_lock:
+            counts = self.stats['handoff'].setdefault(label, {'http': 0, 'browser': 0, 'clearances': 0})
+            counts[kind] += 1
+
+    def host_slot(self, url):
+        """Semaphore limiting parallel requests against the host of url"""
+        host = urlparse(url).netloc
+        with self.host_slots_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(max(1, self.max_workers_per_host))
+            return self.host_slots[host]
+
+    def fetch_lot_detail(self, link, parse_detail):
+        """Download one lot page and run the site's parser on it (worker thread)"""
+        if not self.running:
+            return None
+        with self.host_slot(link):
+            req = self.http_get(link)
+        req.raise_for_status()  # An error page is not a lot; callers see the HTTPError
+        if self.parse_processes > 0:
+            # Raw bytes go to a worker process; only the small lot record comes back
+            lot, seconds = self.get_parse_pool().submit(timed_parse, parse_detail, req.content, link).result()
+        else:
+            lot, seconds = timed_parse(parse_detail, req.text, link)
+        with self.stats_lock:
+            self.stats['parse'].setdefault(parse_detail.__name__, []).append(seconds)
+        return lot
+
+    def get_parse_pool(self):
+        """Process pool for lot page parsing, created before the fetch threads start.
+
+        Workers are spawned rather than forked: a fork taken while browser, AI and
+        fetch threads hold locks would copy those locks into the child still held.
+        """
+        with self.parse_pool_lock:
+            if self.parse_pool is None:
+                self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes,
+                                                      mp_context=multiprocessing.get_context("spawn"))
+            return self.parse_pool
 
-    def setup_driver(self):
-        """Setup Chrome WebDriver with WebDriverManager"""
+    def close_parse_pool(self):
+        with self.parse_pool_lock:
+            pool, self.parse_pool = self.parse_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_lot_details(self, links, parse_detail, on_idle=None):
+        """Fetch lot pages concurrently and yield (link, lot, error) in discovery order.
+
+        links is either a list or a queue.Queue that is closed with None; while
+        waiting on a queue, on_idle is called from the consuming thread. An item
+        may also be a (link, lot) pair whose lot is already known (listing-only
+        mode); it is yielded in its place without a request.
+        """
+        if not isinstance(links, queue.Queue):
+            link_queue = queue.Queue()
+            for link in links:
+                link_queue.put(link)
+            link_queue.put(None)
+            links = link_queue
+
+        workers = max(1, self.max_detail_workers)
+        window = workers * 2
+        pending = deque()
+        discovery_done = False
+        if self.parse_processes > 0:
+            self.get_parse_pool()
+        pool = ThreadPoolExecutor(max_workers=workers)
         try:
-            options = Options()
-            options.add_argument('--headless=new')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--allow-running-insecure-content')
-            options.add_argument('--disable-features=VizDisplayCompositor')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            # Use WebDriverManager to handle version matching
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            
-            # Test the driver
-            self.driver.get("data:text/html,<html><body><h1>Test</h1></body></html>")
-            
+            while self.running:
+                while not discovery_done and len(pending) < window:
+                    try:
+                        link = links.get_nowait()
+                    except queue.Empty:
+                        break
+                    if link is None:
+                        discovery_done = True
+                    elif isinstance(link, tuple):
+                        link, lot = link
+                        known = Future()
+                        known.set_result(lot)
+                        pending.append((link, known))
+                    else:
+                        pending.append((link, pool.submit(self.fetch_lot_detail, link, parse_detail)))
+
+                if pending and (pending[0][1].done() or discovery_done or len(pending) >= window):
+                    yield self.pop_lot_detail(pending)
+                elif discovery_done:
+                    break
+                else:
+                    if on_idle:
+                        on_idle()
+                    if pending:
+                        try:
+                            pending[0][1].exception(timeout=0.1)
+                        except Exception:
+                            pass
+                    else:
+                        time.sleep(0.1)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def pop_lot_detail(self, pending):
+        link, future = pending.popleft()
+        try:
+            return link, future.result(), None
         except Exception as e:
-            self.ui['status'].error(f"Failed to setup ChromeDriver: {e}")
-            raise
+            return link, None, e
 
-    def setup_gemini(self):
+    def crawl_pages(self, fetch_page, first_page, last_page=None, window=None):
+        """Fetch numbered listing pages a window at a time and yield (page, items) in page order.
+
+        fetch_page(page) runs on a worker thread and returns that page's items.
+        The first page that comes back empty marks the end of the catalog: no
+        page past it is dispatched and the crawl stops once it is reached.
+        """
+        window = max(1, window or self.page_window)
+        end_of_catalog = {'page': None}
+        end_lock = threading.Lock()
+
+        def fetch(page):
+            if not self.running:
+                return []
+            items = fetch_page(page)
+            if not items:
+                with end_lock:
+                    if end_of_catalog['page'] is None or page < end_of_catalog['page']:
+                        end_of_catalog['page'] = page
+            return items
+
+        def can_dispatch(page):
+            if last_page is not None and page > last_page:
+                return False
+            with end_lock:
+                return end_of_catalog['page'] is None or page < end_of_catalog['page']
+
+        pending = deque()
+        next_page = first_page
+        pool = ThreadPoolExecutor(max_workers=window)
         try:
-            if not self.gemini_api_keys:
-                self.ui['status'].warning("No Gemini API keys found.")
-                return
+            while self.running:
+                while len(pending) < window and can_dispatch(next_page):
+                    pending.append((next_page, pool.submit(fetch, next_page)))
+                    next_page += 1
+                if not pending:
+                    self.end_crawl(f"reached end page {last_page}")
+                    break
 
-            api_key = self.gemini_api_keys[self.current_api_key_index]
-            self.gemini_client = genai.Client(api_key=api_key)
-            self.ui['status'].info(f"AI price lookup enabled with Gemini Client (API Key {self.current_api_key_index + 1})")
+                page, future = pending.popleft()
+                try:
+                    items = future.result()
+                except Exception as e:
+                    self.post_status('error', f"Error fetching page {page}: {str(e)}")
+                    self.end_crawl(f"error on page {page}: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+                    break
+                if not items:
+                    reason = getattr(items, 'reason', 'no items')
+                    self.post_status('success', f"No items found on page {page} ({reason}). Scraping complete.")
+                    self.end_crawl(f"page {page}: {reason}")
+                    break
+                yield page, items
+            if not self.running:
+                self.end_crawl("stopped by user")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        except Exception as e:
-            self.ui['status'].error(f"An unexpected error occurred setting up Gemini AI: {e}.")
-            self.gemini_client = None
-            traceback.print_exc()
+    def fetch_page_soup(self, url, page, site=None):
+        """Fetch one listing page through the host's pooled session and parse its site's subtree (worker thread)"""
+        with self.host_slot(url):
+            response = self.http_get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to fetch page {page}. Status code: {response.status_code}")
+        return make_soup(response.text, site)
 
-    def can_make_request(self):
-        """Check if we can make a request without hitting rate limits"""
-        now = datetime.now()
-        # Remove requests older than 1 minute
-        self.request_times = [req_time for req_time in self.request_times if now - req_time < timedelta(minutes=1)]
-        
-        return len(self.request_times) < self.max_requests_per_minute
-
-    def wait_for_rate_limit(self):
-        """Wait until we can make another request"""
-        while not self.can_make_request():
-            # Wait until the oldest request is more than 1 minute old
-            if self.request_times:
-                oldest_request = min(self.request_times)
-                wait_time = 60 - (datetime.now() - oldest_request).total_seconds()
-                if wait_time > 0:
-                    self.ui['status'].info(f"Rate limit reached. Waiting {wait_time:.0f} seconds...")
-                    time.sleep(max(1, wait_time))
-            else:
-                break
+    def run_lot_pipeline(self, site_name, discovery, parse_detail):
+        """Crawl listing pages in a background thread while lot pages are fetched and processed.
 
-    def record_request(self):
-        """Record that we made a request"""
-        self.request_times.append(datetime.now())
+        discovery yields (page, [(lot_link, card_lot)]); links go through a queue to
+        the detail workers (card_lot, when complete, stands in for the detail
+        page), and lots reach process_item_no_ai as soon as they are ready.
+        """
+        link_queue = queue.Queue()
+        crawl = {'page': 0, 'links': 0}
 
-    def get_retail_price(self, product_name, image_url):
-        if not self.gemini_client:
-            return None
-            
-        for attempt in range(len(self.gemini_api_keys)):
+        def discover():
             try:
-                # Check rate limits before making request
-                self.wait_for_rate_limit()
-                
-                response = requests.get(image_url, headers=self.headers, stream=True, timeout=15)
-                if response.status_code != 200:
-                    print(f"Failed to download image: {image_url}")
-                    return None
-                
-                image_bytes = response.content
-                
-                prompt_text = f"""
-                **Task**: Find the retail price and a direct product link for the item in the image, described as '{product_name}'.
-                **Output Format**: You MUST reply ONLY in the format: `PRICE, URL`. Example: `199.99, https://www.amazon.com/product`.
-                **Rules**:
-                1. If you cannot find the exact item, find the CLOSEST SIMILAR item from a major retailer (Amazon, Walmart, etc.). NEVER return "NONE" or "Not Found".
-                2. The price must be a number only (e.g., `123.45`). No currency symbols.
-                3. The URL must be a direct retail link, not an auction site.
-                Your entire response must be just the price and the link, separated by a comma.
-                """
-                
-                # Proper content structure with roles
-                contents = [
-                    {
-                        "role": "user",
-                        "parts": [
-                            {"text": prompt_text},
-                            {"inline_data": {"mime_type": "image/png", "data": image_bytes}}
-                        ]
-                    }
-                ]
-                
-                # Record the request timestamp
-                self.record_request()
-                
-                response = self.gemini_client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=contents
+                for page, entries in discovery:
+                    crawl['page'] = page
+                    crawl['links'] += len(entries)
+                    for link, card_lot in entries:
+                        link_queue.put((link, card_lot) if card_lot else link)
+                    if not self.running:
+                        break
+            except Exception as e:
+                self.post_status('error', f"Error while crawling {site_name} listings: {str(e)}")
+            finally:
+                link_queue.put(None)
+
+        def show_crawl_progress():
+            self.flush_ui_events()
+            if crawl['page']:
+                self.ui['metrics']['pages'].metric("Pages Scraped", crawl['page'])
+
+        if self.parse_processes > 0:
+            self.get_parse_pool()  # Before the discovery and fetch threads exist
+        discovery_thread = threading.Thread(target=discover, daemon=True)
+        discovery_thread.start()
+
+        for processed, (link, lot, error) in enumerate(self.fetch_lot_details(link_queue, parse_detail, on_idle=show_crawl_progress), 1):
+            show_crawl_progress()
+            if self.listing_only:
+                self.record_listing(site_name, bool(lot) and lot['source'] == 'listing')
+            if not error and not (lot and lot['source'] == 'listing'):
+                with self.stats_lock:
+                    sources = self.stats['structured'].setdefault(site_name, {'json': 0, 'html': 0, 'none': 0})
+                    sources[lot['source'] if lot else 'none'] += 1
+            if error:
+                self.ui['status'].warning(f"Error processing product {processed}: {str(error)}")
+            elif lot:
+                self.process_item_no_ai(
+                    title=lot['title'],
+                    product_url=link,
+                    sold_price_text=lot['sold_price'],
+                    retail_price_text=lot['retail_price'],
+                    item_index=processed,
+                    total_items_on_page=max(crawl['links'], processed),
+                    category=lot['category']
                 )
 
-                response_text = response.text.strip()
-                match = re.search(r'([\d,]+\.?\d*)\s*,\s*(https?://\S+)', response_text)
-                if match:
-                    price = match.group(1).replace(',', '')
-                    link = match.group(2)
-                    return f"{price}, {link}"
-                else:
-                    print(f"AI response format invalid: {response_text}")
-                    raise ValueError("Invalid AI response format")
+        discovery_thread.join(timeout=5)
+        show_crawl_progress()
 
-            except Exception as e:
-                error_str = str(e)
-                
-                # Check if it's a 429 rate limit error
-                if "429" in error_str and "RESOURCE_EXHAUSTED" in error_str:
-                    self.ui['status'].warning("Rate limit hit! Waiting 30 seconds before retry...")
-                    time.sleep(30)  # Wait 30 seconds on 429 error
-                    
-                    # Try one more time with current API key
-                    try:
-                        self.record_request()
-                        response = self.gemini_client.models.generate_content(
-                            model="gemini-2.5-flash",
-                            contents=contents
-                        )
-                        response_text = response.text.strip()
-                        match = re.search(r'([\d,]+\.?\d*)\s*,\s*(https?://\S+)', response_text)
-                        if match:
-                            price = match.group(1).replace(',', '')
-                            link = match.group(2)
-                            return f"{price}, {link}"
-                    except Exception as retry_e:
-                        self.ui['status'].warning(f"Retry failed: {retry_e}")
-                
-                print("\n--- ERROR IN get_retail_price ---")
-                traceback.print_exc()
-                print("---------------------------------\n")
-                
-                # Switch to next API key
-                self.current_api_key_index = (self.current_api_key_index + 1) % len(self.gemini_api_keys)
-                self.ui['status'].warning(f"Switching to Gemini API Key {self.current_api_key_index + 1} due to error.")
-                self.setup_gemini()
-                
-                # Reset rate limiting for new API key
-                self.request_times = []
-        
-        self.ui['status'].error("All Gemini API keys failed. Disabling AI for this session.")
-        self.gemini_client = None
-        return None
+    def post_status(self, level, message):
+        """Queue a status message from a worker thread; shown by flush_ui_events"""
+        self.ui_events.put((level, message))
+
+    def flush_ui_events(self):
+        """Show queued worker messages and priced lots - must be called from the Streamlit thread"""
+        while True:
+            try:
+                level, message = self.ui_events.get_nowait()
+            except queue.Empty:
+                break
+            getattr(self.ui['status'], level)(message)
+        self.drain_ai_results()
 
     def run(self, site, url, start_page, end_page):
+        ai_stop_reason = "run stopped"  # Also Streamlit's Stop/rerun, raised past the except below
         try:
             # Sites that need Chrome WebDriver
             selenium_sites = ["HiBid", "BiddingKings", "BidLlama", "MAC.bid", "Vista", "BidAuctionDepot", "BidSoflo"]
+            # Sites whose pages can be loaded by several browsers at once
+            pooled_sites = ["HiBid", "BiddingKings", "BidLlama"]
             
+            self.site = site
             if site in selenium_sites:
-                self.setup_driver()
+                self.setup_driver(self.driver_pool_size if site in pooled_sites else 1)
                 
             if site == "HiBid": 
                 self.scrape_hibid(url, start_page, end_page)
@@ -244,57 +2235,195 @@ class AuctionScraper:
                 self.scrape_bidsoflo(url, start_page, end_page)
             elif site == "BidAuctionDepot":
                 self.scrape_bidauctiondepot(url, start_page, end_page)
+            
+            if not self.running:
+                self.end_crawl("stopped by user")
+            self.end_crawl(f"reached end page {end_page}" if end_page else "crawl finished")
+            self.finish_ai_pricing()
         except Exception as e:
             self.ui['status'].error(f"An unexpected error occurred during scraping: {e}")
             traceback.print_exc()
+            ai_stop_reason = f"scrape error ({type(e).__name__})"
         finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+            self.stop_ai_workers(ai_stop_reason)
+            self.quit_drivers()
+            self.close_sessions()
+            self.close_parse_pool()
+            self.save_traffic_baseline()
         return self.products
 
-    def process_item(self, title, product_url, image_url, sold_price_text, item_index, total_items_on_page, category=None):
+    def process_item(self, title, product_url, image_url, sold_price_text, category=None):
+        """Queue a lot for the AI pricing stage; the crawl carries on without waiting"""
         try:
-            self.ui['status'].info(f"Processing item {item_index}/{total_items_on_page}: {title[:40]}...")
             sold_price_float = round(float(sold_price_text.replace("$", "").replace("USD", "").replace(",", "").strip()), 2)
-            
-            ai_result = self.get_retail_price(title, image_url)
+        except ValueError as e:
+            self.ui['status'].warning(f"Skipping item '{title[:30]}...' due to error: {e}")
+            return
+        if not self.ai_threads:
+            self.start_ai_workers()
+        lot = {'title': title, 'product_url': product_url, 'image_url': image_url,
+               'sold_price': sold_price_float, 'category': category}
+        self.ai_counts['queued'] += 1
+        self.ai_queue.put((self.ai_priority_key(lot), next(self.ai_sequence), lot))
+        self.show_ai_queue()
+
+    def ai_priority_key(self, lot):
+        """Queue position of a lot: smallest first, so scores are negated"""
+        if self.ai_priority == "crawl_order":
+            return (0,)
+        if self.ai_priority == "keywords":
+            text = f"{lot['title']} {lot['category'] or ''}".lower()
+            keywords = [word.strip().lower() for word in self.ai_priority_keywords.split(",") if word.strip()]
+            return (-sum(word in text for word in keywords), -lot['sold_price'])
+        return (-lot['sold_price'],)
+
+    def start_ai_workers(self):
+        count = self.ai_workers or (self.gemini.healthy() if self.gemini else 1)
+        for _ in range(max(1, count)):
+            thread = threading.Thread(target=self.ai_worker, daemon=True)
+            thread.start()
+            self.ai_threads.append(thread)
+
+    def ai_worker(self):
+        """Price queued lots, up to ai_batch_size at a time, until a None sentinel;
+        results go to ai_results"""
+        finished = False
+        while not finished:
+            _, _, lot = self.ai_queue.get()
+            if lot is None:
+                break
+            batch = [lot]
+            while len(batch) < self.ai_batch_size:
+                try:
+                    _, _, lot = self.ai_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if lot is None:
+                    finished = True
+                    break
+                batch.append(lot)
+            results = [(None, self.unpriced_reason())] * len(batch)
+            if self.ai_active() and self.gemini:
+                try:
+                    results = self.get_retail_prices(batch)
+                except Exception as e:
+                    self.post_status('warning', f"AI lookup failed for {len(batch)} lots: {e}")
+                    results = [(None, "AI lookup failed")] * len(batch)
+            for lot, (result, reason) in zip(batch, results):
+                self.ai_results.put((lot, result, reason))
+
+    def drain_ai_results(self):
+        """Add priced lots to the results - must be called from the Streamlit thread"""
+        drained = False
+        while True:
+            try:
+                lot, ai_result, reason = self.ai_results.get_nowait()
+            except queue.Empty:
+                break
+            drained = True
+            self.ai_counts['done'] += 1
             if ai_result:
-                price_part, link_part = ai_result.split(',', 1)
-                retail_price_float = round(float(price_part.strip().replace('$', '')), 2)
-                
-                if retail_price_float > 0:
-                    percentage = round((sold_price_float / retail_price_float) * 100, 2)
-                    self.percentages.append(percentage)
-                    
-                    # Format the data for display with proper formatting
-                    data = {
-                        "Link": product_url, 
-                        "Title": title, 
-                        "Sold Price": f"${sold_price_float:,.2f}",
-                        "Retail Price": f"${retail_price_float:,.2f}",
-                        "Recovery": f"{percentage:.1f}%"
-                    }
-                    
-                    # Add category if available (for sites that provide it)
-                    if category:
-                        data["Category"] = category
-                    
-                    self.products.append(data)
-                    
-                    df = pd.DataFrame(self.products)
-                    self.ui['dataframe'].dataframe(df, use_container_width=True)
-                    
-                    avg_recovery = statistics.mean(self.percentages) if self.percentages else 0
-                    self.ui['metrics']['lots'].metric("Lots Scraped", len(self.products))
-                    self.ui['metrics']['recovery'].metric("Average Recovery", f"{avg_recovery:.1f}%")
-                    self.ui['progress'].progress(item_index / total_items_on_page, text=f"Page Progress: {item_index}/{total_items_on_page}")
+                self.add_priced_lot(lot, ai_result)
             else:
-                self.ui['status'].warning(f"Skipping '{title[:30]}...' - AI could not find a retail price.")
+                self.record_unpriced(lot, reason)
+                if reason == "no valid AI answer":
+                    self.ui['status'].warning(f"Skipping '{lot['title'][:30]}...' - AI could not find a retail price.")
+        if drained:
+            self.show_ai_queue()
+
+    def show_ai_queue(self):
+        queued, done = self.ai_counts['queued'], self.ai_counts['done']
+        if 'ai_queue' in self.ui['metrics']:
+            self.ui['metrics']['ai_queue'].metric("AI Queue", queued - done, f"{done} of {queued} priced", delta_color="off")
+        self.ui['progress'].progress(done / queued, text=f"AI Pricing: {done}/{queued} lots")
+        with self.stats_lock:
+            counts = self.stats['price_cache']
+            hits, lookups = counts['hits'], counts['hits'] + counts['misses']
+        if lookups and 'cache' in self.ui['metrics']:
+            self.ui['metrics']['cache'].metric("AI Cache Hits", f"{hits / lookups:.0%}", f"{hits} of {lookups} lots", delta_color="off")
+
+    def finish_ai_pricing(self):
+        """Wait for the lots still queued after the crawl, then stop the AI workers"""
+        if not self.ai_threads:
+            return
+        started = time.monotonic()
+        while self.running and self.ai_counts['done'] < self.ai_counts['queued']:
+            self.flush_ui_events()
+            self.ui['status'].info(f"Crawl finished; pricing {self.ai_counts['queued'] - self.ai_counts['done']} queued lots with Gemini...")
+            time.sleep(0.5)
+        self.stop_ai_workers()
+        self.flush_ui_events()
+        self.record_wait("AI pricing after crawl", time.monotonic() - started)
+        if self.unpriced_lots:
+            self.ui['status'].warning(f"{len(self.unpriced_lots)} of {self.ai_counts['queued']} lots were left without a retail price; "
+                                      "they are listed under 'Unpriced Lots'")
+
+    def ai_active(self):
+        """False once the run or the AI stage has been stopped"""
+        return self.running and self.ai_stop_reason is None
+
+    def stop_ai_workers(self, reason="run stopped"):
+        """Drop lots not yet started (recorded as unpriced for reason), wait for
+        every AI worker to exit and add the results of the batches they finished.
+        Workers stop waiting on rate limits at once; a request already sent is
+        allowed to finish."""
+        self.ai_stop_reason = reason
+        while True:
+            try:
+                _, _, lot = self.ai_queue.get_nowait()
+            except queue.Empty:
+                break
+            if lot is not None:
+                self.ai_counts['done'] += 1
+                self.record_unpriced(lot, reason)
+        for _ in self.ai_threads:
+            self.ai_queue.put(((math.inf,), next(self.ai_sequence), None))
+        for thread in self.ai_threads:
+            thread.join()
+        self.ai_threads = []
+        self.drain_ai_results()
+
+    def record_unpriced(self, lot, reason):
+        self.unpriced_lots.append({
+            "Link": lot['product_url'],
+            "Title": lot['title'],
+            "Sold Price": f"${lot['sold_price']:,.2f}",
+            "Reason": reason
+        })
+
+    def add_priced_lot(self, lot, ai_result):
+        try:
+            retail_price_float = ai_result['price']
+            
+            if retail_price_float > 0:
+                percentage = round((lot['sold_price'] / retail_price_float) * 100, 2)
+                self.percentages.append(percentage)
+                
+                # Format the data for display with proper formatting
+                data = {
+                    "Link": lot['product_url'], 
+                    "Title": lot['title'], 
+                    "Sold Price": f"${lot['sold_price']:,.2f}",
+                    "Retail Price": f"${retail_price_float:,.2f}",
+                    "Recovery": f"{percentage:.1f}%",
+                    "AI Match": ai_result['matched_product'],
+                    "AI Confidence": f"{ai_result['confidence']:.0%}"
+                }
+                
+                # Add category if available (for sites that provide it)
+                if lot['category']:
+                    data["Category"] = lot['category']
+                
+                self.products.append(data)
+                
+                df = pd.DataFrame(self.products)
+                self.ui['dataframe'].dataframe(df, use_container_width=True)
+                
+                avg_recovery = statistics.mean(self.percentages) if self.percentages else 0
+                self.ui['metrics']['lots'].metric("Lots Scraped", len(self.products))
+                self.ui['metrics']['recovery'].metric("Average Recovery", f"{avg_recovery:.1f}%")
         except Exception as e:
-            self.ui['status'].warning(f"Skipping item '{title[:30]}...' due to error: {e}")
+            self.ui['status'].warning(f"Skipping item '{lot['title'][:30]}...' due to error: {e}")
 
     def process_item_no_ai(self, title, product_url, sold_price_text, retail_price_text, item_index, total_items_on_page, category=None):
         """Process items that already have retail prices (no AI needed)"""
@@ -335,42 +2464,32 @@ class AuctionScraper:
     # AI-Powered Scrapers (HiBid, BiddingKings, BidLlama)
     def scrape_hibid(self, url, start_page, end_page):
         base_url = url.split("/catalog")[0]
-        page = start_page
-        while self.running and (end_page == 0 or page <= end_page):
-            self.ui['status'].info(f"Navigating to HiBid Page: {page}...")
-            current_url = f"{url}{'&' if '?' in url else '?'}apage={page}"
-            self.driver.get(current_url)
-            self.ui['metrics']['pages'].metric("Pages Scraped", page)
-            try:
-                WebDriverWait(self.driver, 40).until(EC.presence_of_element_located((By.XPATH, "//h2[@class='lot-title']")))
-            except:
-                self.ui['status'].success("No more pages found. Scraping complete.")
-                break
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            products = [p for p in soup.find_all("app-lot-tile") if p.find("strong", class_="lot-price-realized")]
-            if not products:
-                self.ui['status'].success("No more items with prices on this page. Scraping complete.")
-                break
+        def load_page(driver, page):
+            driver.get(f"{url}{'&' if '?' in url else '?'}apage={page}")
+            end_of_catalog = self.wait_for_lots(driver, "HiBid", "h2.lot-title")
+            messages = self.read_network_log(driver, "HiBid")
+            if end_of_catalog is not None:
+                return end_of_catalog
+
+            return [{
+                'title': card['title'].strip(),
+                'product_url': base_url + card['href'],
+                'image_url': card['image'],
+                'sold_price_text': card['price']
+            } for card in self.extract_lots(driver, "HiBid", messages)]
 
-            for i, p in enumerate(products, 1):
+        pages = self.crawl_pages(lambda page: self.with_driver(lambda driver: load_page(driver, page)),
+                                 start_page, end_page or None, window=len(self.drivers))
+        for page, lots in pages:
+            self.flush_ui_events()
+            self.ui['status'].info(f"Processing HiBid Page: {page}...")
+            self.ui['metrics']['pages'].metric("Pages Scraped", page)
+
+            for lot in lots:
                 if not self.running: break
-                title_tag = p.find("h2", class_="lot-title")
-                link_tag = p.find("a")
-                img_tag = p.find("img", class_="lot-thumbnail img-fluid")
-                price_tag = p.find("strong", class_="lot-price-realized")
-                
-                if all([title_tag, link_tag, img_tag, price_tag]):
-                    self.process_item(
-                        title=title_tag.text.strip(),
-                        product_url=base_url + link_tag.get("href"),
-                        image_url=img_tag['src'],
-                        sold_price_text=price_tag.text,
-                        item_index=i,
-                        total_items_on_page=len(products)
-                    )
-                time.sleep(0.5)
-            page += 1
+                self.process_item(**lot)
+        self.flush_ui_events()
 
     def generate_next_bidllama_urls(self, original_url, total_pages=500):
         if "#" not in original_url: return [original_url]
@@ -390,143 +2509,163 @@ class AuctionScraper:
 
     def scrape_biddingkings(self, url, start_page, end_page):
         base_url = "https://auctions.biddingkings.com"
-        page = start_page
-        while self.running and (end_page == 0 or page <= end_page):
-            current_url = f"{url}?page={page}"
+
+        def load_page(driver, page):
+            previous = self.first_element(driver, "div[class*='lot-repeater-index']")
+            driver.get(f"{url}?page={page}")
+            self.wait_until_ready(driver, "BiddingKings page", previous=previous)
+            end_of_catalog = self.wait_for_lots(driver, "BiddingKings", "div[class*='lot-repeater-index']")
+            messages = self.read_network_log(driver, "BiddingKings")
+            if end_of_catalog is not None:
+                return end_of_catalog
+            # The first browser to reach a catalog page holds the site's cookies
+            with http_details['lock']:
+                if not http_details['seeded']:
+                    seed_session(driver)
+
+            return [{
+                'title': card['title'].strip(),
+                'product_url': base_url + card['href'],
+                'image_url': card['image'],
+                'sold_price_text': card.get('sold') if self.listing_only else None
+            } for card in self.extract_lots(driver, "BiddingKings", messages)]
+
+        def load_sold_price(driver, product_url):
+            driver.get(product_url)
+            self.read_network_log(driver, "BiddingKings lot")
+            return parse_biddingkings_detail(driver.page_source)
+
+        def seed_session(driver):
+            self.browser_session(driver, self.get_session(base_url))
+            http_details['seeded'] = True
+
+        # Lot pages go over HTTP with the browser's cookies (copied once a catalog page
+        # has loaded, again after a 403); a lot whose HTML lacks the sold amount is
+        # loaded in Chrome, and HTTP is dropped if it never has it
+        http_details = {'enabled': True, 'hits': 0, 'misses': 0, 'seeded': False, 'lock': threading.Lock()}
+
+        pages = self.crawl_pages(lambda page: self.with_driver(lambda driver: load_page(driver, page)),
+                                 start_page, end_page or None, window=len(self.drivers))
+        for page, lots in pages:
+            self.flush_ui_events()
             self.ui['status'].info(f"Scraping BiddingKings Page: {page}")
             self.ui['metrics']['pages'].metric("Pages Scraped", page)
             
-            self.driver.get(current_url)
-            time.sleep(3)
-            try:
-                WebDriverWait(self.driver, 40).until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'lot-repeater-index')]")))
-            except:
-                self.ui['status'].success("No more pages found. Scraping complete.")
-                break
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            products = soup.find_all("div", class_=re.compile(r'lot-repeater-index'))
-            if not products:
-                self.ui['status'].success("No more items. Scraping complete.")
-                break
+            # Only lots whose card had no sold amount need their page
+            links = [lot['product_url'] for lot in lots if not lot['sold_price_text']]
+            if http_details['enabled']:
+                details = self.fetch_lot_details(links, parse_biddingkings_detail)
+            else:
+                details = ((link, None, None) for link in links)
+            reseeded = False
                 
-            for i, p in enumerate(products, 1):
+            for lot in lots:
                 if not self.running: break
-                link_tag = p.find("a")
-                img_tag = p.find("img")
-                
-                if link_tag and img_tag:
-                    title = link_tag.text.strip()
-                    product_url = base_url + link_tag.get("href")
-                    
-                    self.driver.get(product_url)
-                    product_soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                    price_tag = product_soup.find("span", class_="sold-amount")
-                    
-                    if price_tag:
-                        self.process_item(
-                            title=title,
-                            product_url=product_url,
-                            image_url=img_tag.get('ng-src'),
-                            sold_price_text=price_tag.text,
-                            item_index=i,
-                            total_items_on_page=len(products)
-                        )
-                time.sleep(0.5)
-            page += 1
+                sold_price_text = lot.pop('sold_price_text')
+                if self.listing_only:
+                    self.record_listing("BiddingKings", bool(sold_price_text))
+                if not sold_price_text:
+                    link, sold_price_text, error = next(details, (lot['product_url'], None, None))
+                    if getattr(getattr(error, 'response', None), 'status_code', None) == 403 and not reseeded:
+                        # Cookies expired or were never valid: take fresh ones from the browser
+                        self.with_driver(seed_session)
+                        reseeded = True
+                    if sold_price_text:
+                        http_details['hits'] += 1
+                        self.record_handoff("BiddingKings lots", 'http')
+                    else:
+                        if http_details['enabled']:
+                            http_details['misses'] += 1
+                            if http_details['misses'] >= 5 and not http_details['hits']:
+                                http_details['enabled'] = False
+                                self.ui['status'].info("Lot pages don't include the sold amount over HTTP; loading them in Chrome")
+                        sold_price_text = self.with_driver(lambda driver: load_sold_price(driver, link))
+                        self.record_handoff("BiddingKings lots", 'browser')
+                
+                if sold_price_text:
+                    self.process_item(sold_price_text=sold_price_text, **lot)
+        self.flush_ui_events()
 
     def scrape_bidllama(self, url, start_page, end_page):
         base_url = "https://bid.bidllama.com"
-        page = start_page
         paginated_urls = self.generate_next_bidllama_urls(url)
-        
-        while self.running and (end_page == 0 or page <= end_page):
+
+        def load_page(driver, page):
             if page - 1 >= len(paginated_urls):
-                self.ui['status'].success("Reached end of generated URLs.")
-                break
-                
-            current_url = paginated_urls[page-1]
+                return EndOfCatalog("reached end of generated URLs")
+            # Pages differ only in the URL fragment, so wait for the old grid to be replaced
+            previous = self.first_element(driver, "div.item-row.grid > div")
+            driver.get(paginated_urls[page-1])
+            self.wait_until_ready(driver, "BidLlama page", previous=previous)
+            end_of_catalog = self.wait_for_lots(driver, "BidLlama", "p.item-lot-number")
+            messages = self.read_network_log(driver, "BidLlama")
+            if end_of_catalog is not None:
+                return end_of_catalog
+            
+            lots = []
+            for card in self.extract_lots(driver, "BidLlama", messages):
+                image_url = card['image']
+                if not image_url.startswith('http'):
+                    image_url = "https:" + image_url
+                lots.append({
+                    'title': card['title'].strip(),
+                    'product_url': base_url + card['href'],
+                    'image_url': image_url,
+                    'sold_price_text': card['price']
+                })
+            return lots or EndOfCatalog("no lots in item grid")
+
+        pages = self.crawl_pages(lambda page: self.with_driver(lambda driver: load_page(driver, page)),
+                                 start_page, end_page or None, window=len(self.drivers))
+        for page, lots in pages:
+            self.flush_ui_events()
             self.ui['status'].info(f"Scraping BidLlama Page: {page}")
             self.ui['metrics']['pages'].metric("Pages Scraped", page)
-            
-            self.driver.get(current_url)
-            time.sleep(5)
-            try:
-                WebDriverWait(self.driver, 40).until(EC.presence_of_element_located((By.XPATH, "//p[@class='item-lot-number']")))
-            except:
-                self.ui['status'].success("No more pages found. Scraping complete.")
-                break
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            item_container = soup.find("div", class_="item-row grid")
-            if not item_container:
-                self.ui['status'].success("No item container found on page. Scraping complete.")
-                break
-            
-            products = item_container.find_all("div", recursive=False)
-            if not products:
-                self.ui['status'].success("No more items. Scraping complete.")
-                break
 
-            for i, p in enumerate(products, 1):
+            for lot in lots:
                 if not self.running: break
-                title_tag = p.find("p", class_="item-title")
-                img_container = p.find("p", class_="item-image")
-                price_tag = p.find("p", class_="item-current-bid")
-                
-                if title_tag and img_container and price_tag:
-                    link_tag = img_container.find("a")
-                    img_tag = img_container.find("img")
-                    if link_tag and img_tag:
-                        product_url = base_url + link_tag.get("href")
-                        image_url = img_tag.get('src', '')
-                        if not image_url.startswith('http'):
-                            image_url = "https:" + image_url
-                        
-                        self.process_item(
-                            title=title_tag.text.strip(),
-                            product_url=product_url,
-                            image_url=image_url,
-                            sold_price_text=price_tag.text,
-                            item_index=i,
-                            total_items_on_page=len(products)
-                        )
-                time.sleep(0.5)
-            page += 1
+                self.process_item(**lot)
+        self.flush_ui_events()
 
     # Direct Price Scrapers (Nellis, BidFTA, MAC.bid)
     def scrape_nellis(self, url, start_page, end_page):
         """Scrape Nellis Auction - uses requests (no AI needed, has retail prices)"""
+        self.run_lot_pipeline("Nellis", self.discover_nellis_links(url, start_page, end_page), parse_nellis_detail)
+
+    def discover_nellis_links(self, url, start_page, end_page):
+        """Walk Nellis listing pages, yielding (page, [(lot_link, card_lot)]) - runs in the discovery thread"""
         base_url = "https://www.nellisauction.com"
         current_url = url
         if not current_url.startswith("http"):
             current_url = f"https://{current_url}"
             
-        links = []
         page = start_page
         
         while self.running and (end_page == 0 or page <= end_page):
             try:
-                self.ui['status'].info(f"Fetching Nellis page {page}...")
-                req = requests.get(current_url, headers=self.headers)
+                self.post_status('info', f"Fetching Nellis page {page}...")
+                req = self.http_get(current_url)
                 
                 if req.status_code != 200:
-                    self.ui['status'].error(f"Failed to fetch page {page}. Status code: {req.status_code}")
+                    self.post_status('error', f"Failed to fetch page {page}. Status code: {req.status_code}")
+                    self.end_crawl(f"page {page}: status code {req.status_code}")
                     break
                     
-                soup = BeautifulSoup(req.text, "html.parser")
+                soup = make_soup(req.text, "Nellis")
                 products = soup.find_all("li", class_="__list-item-base")
                 
                 if not products:
+                    self.end_crawl(f"page {page}: no lots")
                     break
                     
+                links = []
                 for p in products:
                     link_tag = p.find("a")
                     if link_tag and link_tag.get("href"):
                         product_url = base_url + link_tag.get("href")
-                        links.append(product_url)
+                        links.append((product_url, parse_listing_card(p, link_tag) if self.listing_only else None))
                         
-                self.ui['metrics']['pages'].metric("Pages Scraped", page)
+                yield page, links
                 
                 # Find next page
                 pagination_links = soup.find_all("a", class_="__pagination-link")
@@ -540,7 +2679,18 @@ class AuctionScraper:
                         next_page = link.get("href")
                         break
                 
+                if not pagination_links:
+                    if len(products) < NELLIS_PAGE_SIZE:
+                        # No pagination bar on a short page: the catalog fits on one page
+                        self.end_crawl(f"page {page}: last page (no pagination)")
+                        break
+                    # A full page of lots with no pagination bar at all means the
+                    # markup (or PARSE_SUBTREES["Nellis"]) no longer matches
+                    self.post_status('warning', f"Nellis page {page} has no pagination links; stopping here")
+                    self.end_crawl(f"page {page}: no pagination links found")
+                    break
                 if not next_page:
+                    self.end_crawl(f"page {page}: no next-page link")
                     break
                     
                 current_url = base_url + next_page
@@ -548,70 +2698,16 @@ class AuctionScraper:
                 time.sleep(0.5)
                 
             except Exception as e:
-                self.ui['status'].error(f"Error while fetching page {page}: {str(e)}")
-                break
-        
-        # Process individual products
-        total_products = len(links)
-        processed = 0
-        
-        for link in links:
-            if not self.running:
+                self.post_status('error', f"Error while fetching page {page}: {str(e)}")
+                self.end_crawl(f"error on page {page}: {str(e)}")
                 break
-                
-            try:
-                req = requests.get(link, headers=self.headers)
-                soup = BeautifulSoup(req.text, "html.parser")
-                title = soup.find("h1")
-                title = title.text if title else "Unknown Title"
-                
-                sold_price = " "
-                sold_price_tmp = soup.find_all("p", class_="text-gray-900 font-semibold line-clamp-1 text-label-sm xxs:text-title-xs xs:text-label-md sm:text-title-xs md:text-title-sm lg:text-title-md xl:text-title-sm xxl:text-title-xs")
-                for x in sold_price_tmp:
-                    if "$" in x.text:
-                        sold_price = x.text
-                        break
-                
-                if sold_price != " ":
-                    retail_price = " "
-                    retail_price_tmp = soup.find_all("div", class_="flex flex-col text-left")
-                    for x in retail_price_tmp:
-                        if "Estimated Retail Price" in x.text:
-                            retail_price = x.text.replace("Estimated Retail Price", "").strip()
-                            break
-                        
-                    if retail_price == " ":
-                        retail_price_tmp = soup.find_all("div", class_="grid grid-cols-[minmax(0,_0.6fr)_minmax(0,_1fr)] gap-2 text-left")
-                        for x in retail_price_tmp:
-                            if "Estimated Retail Price" in x.text:
-                                retail_price = x.text.replace("Estimated Retail Price", "").strip()
-                                break 
-                        
-                    if retail_price != " ":
-                        category = " "
-                        category_tmp = soup.find("a", class_="flex items-center gap-1 text-secondary focus-within:outline-secondary hover:underline hover:text-secondary-light w-fit")
-                        if category_tmp:
-                            category = category_tmp.text.strip()
-                            
-                        self.process_item_no_ai(
-                            title=title,
-                            product_url=link,
-                            sold_price_text=sold_price,
-                            retail_price_text=retail_price,
-                            item_index=processed + 1,
-                            total_items_on_page=total_products,
-                            category=category
-                        )
-                
-                processed += 1
-                time.sleep(0.1)
-                
-            except Exception as e:
-                self.ui['status'].warning(f"Error processing product {processed+1}: {str(e)}")
-                processed += 1
 
     def scrape_bidfta(self, url, start_page, end_page):
         """Scrape BidFTA - uses requests (no AI needed, has MSRP)"""
+        self.run_lot_pipeline("BidFTA", self.discover_bidfta_links(url, start_page, end_page), parse_bidfta_detail)
+
+    def discover_bidfta_links(self, url, start_page, end_page):
+        """Walk BidFTA listing pages, yielding (page, [(new_lot_link, card_lot)]) - runs in the discovery thread"""
         base_url = "https://www.bidfta.com"
         current_url = url
         if not current_url.startswith("http"):
@@ -619,108 +2715,37 @@ class AuctionScraper:
             
         urlz = current_url.split("/")
         if len(urlz) > 0 and urlz[-1].isdigit():
-            del urlz[-1]
-        current_url = "/".join(urlz)
-        
-        links = []
-        page = start_page
-        
-        while self.running and (end_page == 0 or page <= end_page):
-            try:
-                self.ui['status'].info(f"Fetching BidFTA page {page}...")
-                page_url = f"{current_url}/{page}"
-                req = requests.get(page_url, headers=self.headers)
-                
-                if req.status_code != 200:
-                    break
-                    
-                soup = BeautifulSoup(req.text, "html.parser")
-                div = soup.find("div", class_="grid grid-cols-1 gap-5 md:gap-6 pb-8 xl:pb-16 md:grid-cols-3 2xl:grid-cols-4")
-                
-                if not div:
-                    break
-                    
-                products = div.find_all("div", class_="block")
-                
-                if not products:
-                    break
-                    
-                new_links = 0
-                for p in products:
-                    link_tag = p.find("a")
-                    if link_tag and link_tag.get("href"):
-                        product_url = base_url + link_tag.get("href")
-                        if product_url not in links:
-                            links.append(product_url)
-                            new_links += 1
-                
-                if new_links == 0:
-                    break
-                
-                self.ui['metrics']['pages'].metric("Pages Scraped", page)
-                page += 1
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.ui['status'].error(f"Error while fetching page {page}: {str(e)}")
-                break
+            del urlz[-1]
+        current_url = "/".join(urlz)
         
-        # Process individual products
-        total_products = len(links)
-        processed = 0
+        seen = set()
+
+        def fetch_listing(page):
+            soup = self.fetch_page_soup(f"{current_url}/{page}", page, "BidFTA")
+            div = soup.find("div", class_=BIDFTA_GRID_CLASS)
+            if not div:
+                return EndOfCatalog("no lot grid")
+            links = []
+            for p in div.find_all("div", class_="block"):
+                link_tag = p.find("a")
+                if link_tag and link_tag.get("href"):
+                    links.append((base_url + link_tag.get("href"), parse_listing_card(p, link_tag) if self.listing_only else None))
+            return links
         
-        for link in links:
-            if not self.running:
+        for page, links in self.crawl_pages(fetch_listing, start_page, end_page or None):
+            self.post_status('info', f"Fetched BidFTA page {page}")
+            new_links = []
+            for product_url, card_lot in links:
+                if product_url not in seen:
+                    seen.add(product_url)
+                    new_links.append((product_url, card_lot))
+            
+            # BidFTA keeps serving the last page past the end of the catalog
+            if not new_links:
+                self.end_crawl(f"page {page}: only repeated lots")
                 break
-                
-            try:
-                req = requests.get(link, headers=self.headers)
-                soup = BeautifulSoup(req.text, "html.parser")
-                
-                title_elem = soup.find("h2")
-                title = title_elem.text.strip() if title_elem else "Unknown Title"
-                
-                sold_price = " "
-                sold_price_elems = soup.find_all("div", class_="flex gap-1 xs:gap-2 items-end text-bidfta-blue-light")
-                for elem in sold_price_elems:
-                    if "CURRENT BID" in elem.text:
-                        price_text = elem.text.replace("\n", "").replace("CURRENT BID", "").strip()
-                        sold_price = re.sub(r"[^\d.]", "", price_text)
-                        if sold_price.startswith("."):
-                            sold_price = sold_price[1:]
-                        if sold_price.endswith("."):
-                            sold_price = sold_price[:-1]
-                        break
-                
-                if sold_price != " ":
-                    retail_price = " "
-                    retail_price_elems = soup.find_all("div", class_="flex gap-1 xs:gap-2 items-end")
-                    for elem in retail_price_elems:
-                        if "MSRP" in elem.text:
-                            price_text = elem.text.replace("MSRP", "").replace("\n", "").strip()
-                            retail_price = re.sub(r"[^\d.]", "", price_text)
-                            if retail_price.startswith("."):
-                                retail_price = retail_price[1:]
-                            if retail_price.endswith("."):
-                                retail_price = retail_price[:-1]
-                            break
-                    
-                    if retail_price != " ":
-                        self.process_item_no_ai(
-                            title=title,
-                            product_url=link,
-                            sold_price_text=sold_price,
-                            retail_price_text=retail_price,
-                            item_index=processed + 1,
-                            total_items_on_page=total_products
-                        )
-                
-                processed += 1
-                time.sleep(0.1)
-                
-            except Exception as e:
-                self.ui['status'].warning(f"Error processing product {processed+1}: {str(e)}")
-                processed += 1
+            
+            yield page, new_links
 
     def scrape_macbid(self, url, start_page, end_page):
         """Scrape MAC.bid - uses Chrome WebDriver (no AI needed, has retail prices)"""
@@ -734,154 +2759,172 @@ class AuctionScraper:
             self.driver.get(current_url)
             base_url = "https://www.mac.bid"
             
-            prev_product_count = 0
+            def process_product(product, index, total):
+                if product['won'] is not None:
+                    self.process_item_no_ai(
+                        title=product['title'].strip(),
+                        product_url=base_url + product['href'] if product['href'] else "",
+                        sold_price_text=product['won'].replace("Won for $", "").strip(),
+                        retail_price_text=product['retail'].replace("Retails for $", "").strip(),
+                        item_index=index,
+                        total_items_on_page=total
+                    )
+            
             page = start_page
-            products_found = []
+            seen = set()
+            processed = 0
+            delay = 0.25  # Adaptive: halves while lots keep coming, doubles while waiting
+            scrolled_at = time.monotonic()
+            stalled_since = None
             
             self.ui['metrics']['pages'].metric("Pages Scraped", page)
+            self.ui['status'].info(f"Loading MAC.bid page {page}...")
             
             while self.running:
-                self.ui['status'].info(f"Loading MAC.bid page {page}...")
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                products = soup.find_all("div", class_="d-block w-100 border-bottom")
+                harvest = self.harvest_macbid_cards(seen)
                 
-                self.ui['metrics']['pages'].metric("Pages Scraped", page)
+                if harvest['lots']:
+                    self.record_wait("MAC.bid scroll batch", time.monotonic() - scrolled_at)
+                for product in harvest['lots']:
+                    if not self.running:
+                        break
+                    processed += 1
+                    try:
+                        process_product(product, processed, harvest['total'])
+                    except Exception as e:
+                        self.ui['status'].warning(f"Error processing product {processed}: {str(e)}")
                 
-                if len(products) != prev_product_count:
-                    prev_product_count = len(products)
+                if harvest['lots']:
+                    stalled_since = None
+                    delay = max(0.1, delay / 2)
                     self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(1)
+                    scrolled_at = time.monotonic()
+                elif harvest['loading']:
+                    stalled_since = None
+                    delay = min(2.0, delay * 2)
+                elif stalled_since is None:
+                    stalled_since = time.monotonic()
+                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                elif time.monotonic() - stalled_since >= self.scroll_idle_timeout:
+                    self.end_crawl(f"scrolling stopped adding lots ({harvest['total']} loaded)")
+                    break
                 else:
-                    if soup.find("div", class_="spinner-grow") is None:
-                        products_found = products
-                        break
-                    else:
-                        time.sleep(2)
+                    delay = min(2.0, delay * 2)
+                time.sleep(delay)
             
-            total_products = len(products_found)
-            processed = 0
-            
-            for product in products_found:
-                if not self.running:
-                    break
-                
-                try:
-                    if product.find("p", class_="badge badge-success") is not None:
-                        title = product.find("p").text.strip()
-                        sold_price = product.find("p", class_="badge badge-success").text.replace("Won for $", "").strip()
-                        retail_price = product.find("p", class_="font-size-sm").text.replace("Retails for $", "").strip()
-                        link_tag = product.find("a")
-                        link = base_url + link_tag["href"] if link_tag and link_tag.get("href") else ""
-                        
-                        self.process_item_no_ai(
-                            title=title,
-                            product_url=link,
-                            sold_price_text=sold_price,
-                            retail_price_text=retail_price,
-                            item_index=processed + 1,
-                            total_items_on_page=total_products
-                        )
-                    
-                    processed += 1
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    self.ui['status'].warning(f"Error processing product {processed+1}: {str(e)}")
+            messages = self.read_network_log(self.driver, "MAC.bid")
+            if self.capture_api and self.running:
+                # Lots the page only ever had in its JSON (e.g. recycled by a virtual list)
+                missed = [product for product in self.capture_api_lots(self.driver, "MAC.bid", messages)
+                          if (product['href'] or (product['title'], product['won'])) not in seen]
+                total = processed + len(missed)
+                for product in missed:
+                    if not self.running:
+                        break
                     processed += 1
+                    try:
+                        process_product(product, processed, total)
+                    except Exception as e:
+                        self.ui['status'].warning(f"Error processing product {processed}: {str(e)}")
                 
         except Exception as e:
             self.ui['status'].error(f"Error in MAC.bid scraper: {str(e)}")
 
+    def harvest_macbid_cards(self, seen):
+        """MAC.bid cards loaded since the last call, skipping lots already in seen (which is updated)"""
+        try:
+            harvest = self.driver.execute_script(MACBID_HARVEST_SCRIPT)
+            method = 'script'
+        except WebDriverException as e:
+            if is_driver_crash(e):
+                raise
+            soup = make_soup(self.driver.page_source)
+            cards = parse_macbid_cards(soup)
+            harvest = {'lots': cards, 'total': len(cards), 'loading': soup.find("div", class_="spinner-grow") is not None}
+            method = 'page_source'
+        if harvest['lots']:
+            self.record_extraction("MAC.bid", method)
+        fresh = []
+        for card in harvest['lots']:
+            key = card['href'] or (card['title'], card['won'])
+            if key not in seen:
+                seen.add(key)
+                fresh.append(card)
+        harvest['lots'] = fresh
+        return harvest
+
     def scrape_astock(self, url, start_page, end_page):
         """Scrape A-Stock.bid - uses requests (no AI needed, has retail prices)"""
         base_url = url.split("?")[0]
-        page = start_page
+
+        def fetch_listing(page):
+            return self.fetch_page_soup(f"{base_url}?page={page}", page, "A-Stock").find_all("section")
         
-        while self.running and (end_page == 0 or page <= end_page):
-            try:
-                self.ui['status'].info(f"Fetching A-Stock page {page}...")
-                current_url = f"{base_url}?page={page}"
-                
-                response = requests.get(current_url, headers=self.headers)
-                if response.status_code != 200:
-                    self.ui['status'].error(f"Failed to fetch page {page}. Status code: {response.status_code}")
+        for page, sections in self.crawl_pages(fetch_listing, start_page, end_page or None):
+            self.flush_ui_events()
+            self.ui['metrics']['pages'].metric("Pages Scraped", page)
+            
+            total_sections = len(sections)
+            self.ui['status'].info(f"Found {total_sections} items on page {page}")
+            
+            for i, section in enumerate(sections, 1):
+                if not self.running:
                     break
                     
-                soup = BeautifulSoup(response.text, "html.parser")
-                sections = soup.find_all("section")
-                
-                if len(sections) == 0:
-                    self.ui['status'].success("No items found. Scraping complete.")
-                    break
-                
-                self.ui['metrics']['pages'].metric("Pages Scraped", page)
-                
-                total_sections = len(sections)
-                self.ui['status'].info(f"Found {total_sections} items on page {page}")
-                
-                for i, section in enumerate(sections, 1):
-                    if not self.running:
-                        break
-                        
-                    try:
-                        title_elem = section.find("h2", class_="title inlinebidding")
-                        if not title_elem:
-                            continue
-                            
-                        linker = section.find("h2", class_="title inlinebidding").find("a")
-                        if linker:
-                            linker = "https://a-stock.bid" + linker.get("href")
-                        else:
-                            linker = "N/A"
-                        
-                        if "-" in title_elem.text:
-                            title = title_elem.text.split("-", 1)[1].lstrip().rstrip()
-                        else:
-                            title = title_elem.text.strip()
-                        
-                        sold_price_elem = section.find("p", class_="bids")
-                        if not sold_price_elem:
-                            continue
-                            
-                        sold_price_text = sold_price_elem.text.strip()
-                        sold_price = re.sub(r"[^\d.]", "", sold_price_text)
-                        
-                        try:
-                            sold_price_float = float(sold_price)
-                        except ValueError:
-                            continue
-                        
-                        retail_price_elem = section.find("div", class_="listing-auction-row-retail-value")
-                        if not retail_price_elem:
-                            continue
-                            
-                        retail_price_text = retail_price_elem.text.strip()
-                        retail_price = re.sub(r"[^\d.]", "", retail_price_text)
+                try:
+                    title_elem = section.find("h2", class_="title inlinebidding")
+                    if not title_elem:
+                        continue
                         
-                        try:
-                            retail_price_float = float(retail_price)
-                        except ValueError:
-                            continue
+                    linker = section.find("h2", class_="title inlinebidding").find("a")
+                    if linker:
+                        linker = "https://a-stock.bid" + linker.get("href")
+                    else:
+                        linker = "N/A"
+                    
+                    if "-" in title_elem.text:
+                        title = title_elem.text.split("-", 1)[1].lstrip().rstrip()
+                    else:
+                        title = title_elem.text.strip()
+                    
+                    sold_price_elem = section.find("p", class_="bids")
+                    if not sold_price_elem:
+                        continue
                         
-                        self.process_item_no_ai(
-                            title=title,
-                            product_url=linker,
-                            sold_price_text=str(sold_price_float),
-                            retail_price_text=str(retail_price_float),
-                            item_index=i,
-                            total_items_on_page=total_sections
-                        )
+                    sold_price_text = sold_price_elem.text.strip()
+                    sold_price = re.sub(r"[^\d.]", "", sold_price_text)
+                    
+                    try:
+                        sold_price_float = float(sold_price)
+                    except ValueError:
+                        continue
+                    
+                    retail_price_elem = section.find("div", class_="listing-auction-row-retail-value")
+                    if not retail_price_elem:
+                        continue
                         
-                    except Exception as e:
-                        self.ui['status'].warning(f"Error processing item {i}: {str(e)}")
+                    retail_price_text = retail_price_elem.text.strip()
+                    retail_price = re.sub(r"[^\d.]", "", retail_price_text)
+                    
+                    try:
+                        retail_price_float = float(retail_price)
+                    except ValueError:
                         continue
-                
-                page += 1
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.ui['status'].error(f"Error fetching page {page}: {str(e)}")
-                break
+                    
+                    self.process_item_no_ai(
+                        title=title,
+                        product_url=linker,
+                        sold_price_text=str(sold_price_float),
+                        retail_price_text=str(retail_price_float),
+                        item_index=i,
+                        total_items_on_page=total_sections
+                    )
+                    
+                except Exception as e:
+                    self.ui['status'].warning(f"Error processing item {i}: {str(e)}")
+                    continue
+        
+        self.flush_ui_events()
 
     def scrape_702auctions(self, url, start_page, end_page):
         """Scrape 702Auctions - uses requests"""
@@ -895,189 +2938,192 @@ class AuctionScraper:
             temp_url = "/".join(temp_url)
             base_url = "https://" + temp_url
         
-        page = start_page - 1 if start_page > 0 else 0
+        first_page = start_page - 1 if start_page > 0 else 0
         
-        while self.running and (end_page == 0 or page < end_page):
-            try:
-                self.ui['status'].info(f"Fetching 702Auctions page {page}...")
-                current_url = f"{base_url}/?ViewStyle=list&StatusFilter=completed_only&SortFilterOptions=0&page={page}"
-                
-                response = requests.get(current_url, headers=self.headers)
-                if response.status_code != 200:
-                    self.ui['status'].error(f"Failed to fetch page {page}. Status code: {response.status_code}")
+        def fetch_listing(page):
+            current_url = f"{base_url}/?ViewStyle=list&StatusFilter=completed_only&SortFilterOptions=0&page={page}"
+            return self.fetch_page_soup(current_url, page, "702Auctions").find_all("section")
+        
+        for page, sections in self.crawl_pages(fetch_listing, first_page, end_page - 1 if end_page else None):
+            self.flush_ui_events()
+            self.ui['metrics']['pages'].metric("Pages Scraped", page + 1)
+            
+            total_sections = len(sections)
+            self.ui['status'].info(f"Found {total_sections} items on page {page}")
+            
+            for i, section in enumerate(sections, 1):
+                if not self.running:
                     break
                     
-                soup = BeautifulSoup(response.text, "html.parser")
-                sections = soup.find_all("section")
-                
-                if not sections:
-                    self.ui['status'].success("No more items found on this page. Ending scrape.")
-                    break
-                
-                self.ui['metrics']['pages'].metric("Pages Scraped", page + 1)
-                
-                total_sections = len(sections)
-                self.ui['status'].info(f"Found {total_sections} items on page {page}")
-                
-                for i, section in enumerate(sections, 1):
-                    if not self.running:
-                        break
+                try:
+                    title_elem = section.find("h2", class_="title inlinebidding")
+                    if not title_elem:
+                        continue
                         
-                    try:
-                        title_elem = section.find("h2", class_="title inlinebidding")
-                        if not title_elem:
-                            continue
-                            
-                        linker = section.find("h3", class_="subtitle")
+                    linker = section.find("h3", class_="subtitle")
+                    if linker:
+                        linker = linker.find("a")
                         if linker:
-                            linker = linker.find("a")
-                            if linker:
-                                link_href = linker.get("href")
-                                if link_href and not link_href.startswith("http"):
-                                    linker = auction_base_url + link_href
-                                else:
-                                    linker = link_href if link_href else "N/A"
+                            link_href = linker.get("href")
+                            if link_href and not link_href.startswith("http"):
+                                linker = auction_base_url + link_href
                             else:
-                                linker = "N/A"
+                                linker = link_href if link_href else "N/A"
                         else:
                             linker = "N/A"
+                    else:
+                        linker = "N/A"
+                    
+                    if "-" in title_elem.text:
+                        title = title_elem.text.split("-", 1)[1].lstrip().rstrip()
+                    else:
+                        title = title_elem.text.strip()
+                    
+                    sold_price_elem = section.find("span", class_="NumberPart")
+                    if not sold_price_elem:
+                        continue
                         
-                        if "-" in title_elem.text:
-                            title = title_elem.text.split("-", 1)[1].lstrip().rstrip()
-                        else:
-                            title = title_elem.text.strip()
-                        
-                        sold_price_elem = section.find("span", class_="NumberPart")
-                        if not sold_price_elem:
-                            continue
-                            
-                        sold_price_text = sold_price_elem.text.strip()
-                        sold_price_match = re.search(r'\$?([\d,]+\.?\d*)', sold_price_text)
-                        if sold_price_match:
-                            sold_price_str = sold_price_match.group(1).replace(',', '')
-                            sold_price_float = float(sold_price_str)
-                        else:
-                            continue
+                    sold_price_text = sold_price_elem.text.strip()
+                    sold_price_match = re.search(r'\$?([\d,]+\.?\d*)', sold_price_text)
+                    if sold_price_match:
+                        sold_price_str = sold_price_match.group(1).replace(',', '')
+                        sold_price_float = float(sold_price_str)
+                    else:
+                        continue
 
-                        retail_price_elem = section.find("h3", class_="subtitle")
-                        if not retail_price_elem:
-                            continue
-                            
-                        retail_price_text = retail_price_elem.text.strip()
-                        retail_price_match = re.search(r'\$?([\d,]+\.?\d*)', retail_price_text)
-                        if retail_price_match:
-                            retail_price_str = retail_price_match.group(1).replace(',', '')
-                            retail_price_float = float(retail_price_str)
-                        else:
-                            continue
-                        
-                        self.process_item_no_ai(
-                            title=title,
-                            product_url=linker,
-                            sold_price_text=str(sold_price_float),
-                            retail_price_text=str(retail_price_float),
-                            item_index=i,
-                            total_items_on_page=total_sections
-                        )
+                    retail_price_elem = section.find("h3", class_="subtitle")
+                    if not retail_price_elem:
+                        continue
                         
-                    except Exception as e:
+                    retail_price_text = retail_price_elem.text.strip()
+                    retail_price_match = re.search(r'\$?([\d,]+\.?\d*)', retail_price_text)
+                    if retail_price_match:
+                        retail_price_str = retail_price_match.group(1).replace(',', '')
+                        retail_price_float = float(retail_price_str)
+                    else:
                         continue
-                
-                page += 1
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.ui['status'].error(f"Error fetching page {page}: {str(e)}")
-                break
+                    
+                    self.process_item_no_ai(
+                        title=title,
+                        product_url=linker,
+                        sold_price_text=str(sold_price_float),
+                        retail_price_text=str(retail_price_float),
+                        item_index=i,
+                        total_items_on_page=total_sections
+                    )
+                    
+                except Exception as e:
+                    continue
+        
+        self.flush_ui_events()
 
     def scrape_vista(self, url, start_page, end_page):
-        """Scrape Vista Auction - uses Chrome WebDriver with Cloudflare handling"""
+        """Scrape Vista Auction - clears Cloudflare in Chrome, then fetches pages over HTTP with the browser's cookies"""
         base_url = url.split("?")[0]
         vista_base_url = "https://vistaauction.com"
-        page = start_page - 1 if start_page > 0 else 0
-        cloudflare_bypassed = False
+        first_page = start_page - 1 if start_page > 0 else 0
+        cloudflare_cleared = set()  # Browsers that already passed the challenge
+        clearance = {'session': None, 'failed': False, 'retired': []}  # retired: closed after the crawl
+        clearance_lock = threading.Lock()
         
-        while self.running and (end_page == 0 or page < end_page):
-            try:
-                current_url = f"{base_url}?page={page}"
-                self.ui['status'].info(f"Fetching Vista Auction page {page}...")
-                
-                if page == (start_page - 1) or not cloudflare_bypassed:
-                    self.ui['status'].info("Loading page and waiting for Cloudflare...")
-                    self.driver.get(current_url)
-                    time.sleep(10)  # Give time for Cloudflare challenge
-                    
-                    # Check if we're past Cloudflare
-                    if "Checking your browser" not in self.driver.page_source:
-                        self.ui['status'].success("Page loaded successfully!")
-                        cloudflare_bypassed = True
-                    else:
-                        self.ui['status'].info("Still handling Cloudflare challenge...")
-                        time.sleep(15)
-                        cloudflare_bypassed = True
-                else:
-                    self.driver.get(current_url)
-                
-                time.sleep(2)
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                sections = soup.find_all("section")
-                
-                if not sections:
-                    self.ui['status'].success("No more items found on this page. Ending scrape.")
+        def load_page(driver, page):
+            driver.get(f"{base_url}?page={page}")
+            if id(driver) not in cloudflare_cleared:
+                self.post_status('info', "Loading page and waiting for Cloudflare...")
+                if not self.wait_for_cloudflare(driver, "Vista Cloudflare"):
+                    self.post_status('info', "Cloudflare challenge still showing, continuing anyway...")
+                cloudflare_cleared.add(id(driver))
+            
+            self.wait_until_ready(driver, "Vista page")
+            self.read_network_log(driver, "Vista")
+            return self.extract_lots(driver, "Vista")
+        
+        def clear_in_browser(driver):
+            driver.get(base_url)
+            cleared = self.wait_for_cloudflare(driver, "Vista Cloudflare")
+            cloudflare_cleared.add(id(driver))
+            return self.browser_session(driver) if cleared else None
+        
+        def current_session(stale=None):
+            """The shared cleared session; re-clears in Chrome once when stale is the current one"""
+            with clearance_lock:
+                if clearance['session'] is stale and not clearance['failed']:
+                    self.post_status('info', "Clearing Cloudflare in Chrome for the HTTP fetcher...")
+                    clearance['session'] = self.with_driver(clear_in_browser)
+                    self.record_handoff("Vista", 'clearances')
+                    if clearance['session'] is None:
+                        clearance['failed'] = True
+                        self.post_status('warning', "Cloudflare did not clear; loading Vista pages in Chrome instead")
+                    if stale is not None:
+                        # Other page threads may still be mid-request on it
+                        clearance['retired'].append(stale)
+                return clearance['session']
+        
+        def fetch_page(page):
+            page_url = f"{base_url}?page={page}"
+            session = clearance['session'] or current_session()
+            for _ in range(2):
+                if session is None:
                     break
-                
+                with self.host_slot(page_url):
+                    response = session.get(page_url, timeout=30)
+                if response.status_code not in (403, 503) and not any(marker in response.text for marker in CLOUDFLARE_MARKERS):
+                    self.record_handoff("Vista", 'http')
+                    return parse_vista_cards(make_soup(response.text, "Vista"))
+                session = current_session(stale=session)
+            self.record_handoff("Vista", 'browser')
+            return self.with_driver(lambda driver: load_page(driver, page))
+        
+        pages = self.crawl_pages(fetch_page, first_page, end_page - 1 if end_page else None,
+                                 window=max(self.page_window, len(self.drivers)))
+        try:
+            for page, sections in pages:
+                self.flush_ui_events()
                 self.ui['metrics']['pages'].metric("Pages Scraped", page + 1)
-                
+            
                 total_sections = len(sections)
                 self.ui['status'].info(f"Found {total_sections} items on page {page}")
-                
+            
                 for i, section in enumerate(sections, 1):
                     if not self.running:
                         break
-                        
+                    
                     try:
-                        title_elem = section.find("h2", class_="title inlinebidding")
-                        if title_elem:
-                            raw_title = title_elem.text.strip()
+                        if section['title'] is not None:
+                            raw_title = section['title'].strip()
                             title = re.sub(r'^Lot \d+\s*-\s*', '', raw_title).strip()
                         else:
                             continue
 
-                        linker_elem = section.find("h3", class_="subtitle")
                         linker = "N/A"
-                        if linker_elem:
-                            link_tag = linker_elem.find("a")
-                            if link_tag:
-                                link_href = link_tag.get("href")
-                                if link_href and not link_href.startswith("http"):
-                                    linker = vista_base_url + link_href
-                                else:
-                                    linker = link_href if link_href else "N/A"
-
-                        sold_price_elem = section.find("span", class_="NumberPart")
-                        if not sold_price_elem:
+                        link_href = section['href']
+                        if link_href and not link_href.startswith("http"):
+                            linker = vista_base_url + link_href
+                        else:
+                            linker = link_href if link_href else "N/A"
+
+                        if section['sold'] is None:
                             continue
-                            
-                        sold_price_text = sold_price_elem.text.strip()
+                        
+                        sold_price_text = section['sold'].strip()
                         sold_price_match = re.search(r'\$?([\d,]+\.?\d*)', sold_price_text)
                         if sold_price_match:
                             sold_price_str = sold_price_match.group(1).replace(',', '')
                             sold_price_float = float(sold_price_str)
                         else:
                             continue
-                        
-                        retail_price_elem = section.find("h3", class_="subtitle")
-                        if not retail_price_elem:
+                    
+                        if section['retail'] is None:
                             continue
 
-                        retail_price_text = retail_price_elem.text.strip()
+                        retail_price_text = section['retail'].strip()
                         retail_price_match = re.search(r'\$?([\d,]+\.?\d*)', retail_price_text)
                         if retail_price_match:
                             retail_price_str = retail_price_match.group(1).replace(',', '')
                             retail_price_float = float(retail_price_str)
                         else:
                             continue
-                        
+                    
                         self.process_item_no_ai(
                             title=title,
                             product_url=linker,
@@ -1086,15 +3132,16 @@ class AuctionScraper:
                             item_index=i,
                             total_items_on_page=total_sections
                         )
-                        
+                    
                     except Exception as e:
                         continue
-                
-                page += 1
-                
-            except Exception as e:
-                self.ui['status'].error(f"Error fetching page {page}: {str(e)}")
-                break
+        
+            self.flush_ui_events()
+        finally:
+            pages.close()
+            for session in clearance['retired'] + [clearance['session']]:
+                if session is not None:
+                    session.close()
 
     def scrape_bidsoflo(self, url, start_page, end_page):
         """Scrape BidSoflo - uses Chrome WebDriver (no AI needed, has retail prices)"""
@@ -1104,29 +3151,23 @@ class AuctionScraper:
         
         self.ui['status'].info("Starting BidSoflo scraper...")
         self.driver.get(current_url)
-        time.sleep(2)
+        self.wait_until_ready(self.driver, "BidSoflo page")
+        self.read_network_log(self.driver, "BidSoflo")
         
         while self.running and (end_page == 0 or page <= end_page):
             try:
                 page_flag = False
                 self.ui['status'].info(f"Fetching BidSoflo page {page}")
                 
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                
-                products = soup.find_all("div", class_="row mr-1")
+                cards = self.extract_lots(self.driver, "BidSoflo")
+                products = cards['lots']
                 
                 # Check for next page
-                tmp_page = soup.find_all("li", class_="page-item")
-                for pa in tmp_page:
-                    if "next" in pa.text.lower():
-                        urlz = pa.find("a", class_="page-link")
-                        if urlz is not None:
-                            urlz = urlz["data-url"].split("page=")[-1]
-                            t_url = current_url.split("=")[-1]
-                            current_url = current_url.replace(t_url, urlz)
-                            page_flag = True
-                        else:
-                            page_flag = False
+                if cards['next']:
+                    urlz = cards['next'].split("page=")[-1]
+                    t_url = current_url.split("=")[-1]
+                    current_url = current_url.replace(t_url, urlz)
+                    page_flag = True
                 
                 self.ui['metrics']['pages'].metric("Pages Scraped", page)
                 
@@ -1139,29 +3180,28 @@ class AuctionScraper:
                         break
                         
                     try:
-                        if p.find("div", class_="tooltip-demos") is not None:
-                            tool = p.find("div", class_="tooltip-demos")
-                            tmp = tool.find_all("div", recursive=False)
+                        if p['details'] is not None:
+                            tmp = p['details']
                             
                             title = " "
                             for xi in tmp:
-                                if "Item Description" in xi.text:
-                                    title = xi.text.replace("Item Description", "").strip()
+                                if "Item Description" in xi:
+                                    title = xi.replace("Item Description", "").strip()
                                     break
                                     
                             if title != " ":
                                 retail_price = " "
                                 for xi in tmp:
-                                    if "Retail Cost:" in xi.text:
-                                        retail_price = xi.text.replace("Retail Cost:", "").replace("$", "").strip()
+                                    if "Retail Cost:" in xi:
+                                        retail_price = xi.replace("Retail Cost:", "").replace("$", "").strip()
                                         break
                                 
                                 if retail_price != " ":
                                     sold_price = " "
-                                    tmp_price = p.find("div", class_="font-bold text-body")
+                                    tmp_price = p['bid']
                                     if tmp_price is not None:
-                                        if "Final Bid :" in tmp_price.text:
-                                            sold_price = tmp_price.text.replace("Final Bid :", "").replace("$", "").strip()
+                                        if "Final Bid :" in tmp_price:
+                                            sold_price = tmp_price.replace("Final Bid :", "").replace("$", "").strip()
                                             
                                             if sold_price != " ":
                                                 try:
@@ -1170,8 +3210,7 @@ class AuctionScraper:
                                                 except (ValueError, ZeroDivisionError):
                                                     continue
                                                 
-                                                link_tag = p.find("a")
-                                                link = base_url + link_tag["href"] if link_tag and link_tag.get("href") else "N/A"
+                                                link = base_url + p['href'] if p['href'] else "N/A"
                                                 
                                                 self.process_item_no_ai(
                                                     title=title,
@@ -1192,11 +3231,14 @@ class AuctionScraper:
                 
                 if page_flag:
                     self.ui['status'].info(f"Moving to page {page+1}...")
+                    previous = self.first_element(self.driver, "div.row.mr-1")
                     self.driver.get(current_url)
                     page += 1
-                    time.sleep(2)
+                    self.wait_until_ready(self.driver, "BidSoflo page", previous=previous)
+                    self.read_network_log(self.driver, "BidSoflo")
                 else:
                     self.ui['status'].success("No more pages to fetch.")
+                    self.end_crawl(f"page {page}: no next-page link")
                     break
                     
             except Exception as e:
@@ -1212,7 +3254,8 @@ class AuctionScraper:
         
         self.ui['status'].info("Starting BidAuctionDepot scraper...")
         self.driver.get(url)
-        time.sleep(3)
+        self.wait_until_ready(self.driver, "BidAuctionDepot page")
+        self.read_network_log(self.driver, "BidAuctionDepot")
         
         while self.running and flag and (end_page == 0 or page <= end_page):
             try:
@@ -1226,12 +3269,11 @@ class AuctionScraper:
                 except Exception as e:
                     self.ui['status'].error(f"Error waiting for products: {str(e)}")
                             
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                
-                products = soup.find_all('div', class_=lambda c: c and "card grid-card a gallery auction" in c)
+                products = self.extract_lots(self.driver, "BidAuctionDepot")
                 
                 if not products:
                     self.ui['status'].success("No products found. Scraping complete.")
+                    self.end_crawl(f"page {page}: no lots")
                     break
                 
                 self.ui['metrics']['pages'].metric("Pages Scraped", page)
@@ -1244,35 +3286,32 @@ class AuctionScraper:
                         break
                         
                     try:
-                        title_elem = p.find("h5")
-                        if not title_elem:
+                        if p['title'] is None:
                             continue
                             
-                        title = title_elem.text.strip()
+                        title = p['title'].strip()
                         
-                        retail_price_elem = p.select_one("h6.galleryPrice.rtlrPrice")
-                        if not retail_price_elem:
+                        if p['retail'] is None:
                             continue
                             
-                        retail_price_text = retail_price_elem.text.replace("Retail Price:", "").replace("$", "").replace(",", "").strip()
+                        retail_price_text = p['retail'].replace("Retail Price:", "").replace("$", "").replace(",", "").strip()
                         
                         try:
                             retail_price_float = float(retail_price_text)
                         except ValueError:
                             continue
                         
-                        sold_price_elem = p.find("span", class_="curBidAmtt")
-                        if not sold_price_elem:
+                        if p['bid'] is None:
                             continue
                             
-                        sold_price_text = sold_price_elem.text.replace("Current Bid:", "").replace("$", "").replace(",", "").strip()
+                        sold_price_text = p['bid'].replace("Current Bid:", "").replace("$", "").replace(",", "").strip()
                         
                         try:
                             sold_price_float = float(sold_price_text)
                         except ValueError:
                             continue
                         
-                        link_elem = p.get("id")
+                        link_elem = p['id']
                         if not link_elem:
                             continue
                             
@@ -1280,6 +3319,7 @@ class AuctionScraper:
                         
                         if lot_id == link_id:
                             self.ui['status'].warning("Duplicate lot found. Ending scrape.")
+                            self.end_crawl(f"page {page}: repeated lot {link_id}")
                             flag = False
                             break
                         else:
@@ -1312,13 +3352,16 @@ class AuctionScraper:
                     )
                     
                     if next_page_exists:
+                        previous = self.first_element(self.driver, 'div[class*="card grid-card a gallery auction"]')
                         next_button = self.driver.find_element(By.XPATH, "//a[@aria-label='Go to next page']")
                         next_button.click()
                         page += 1
-                        time.sleep(3)
+                        self.wait_until_ready(self.driver, "BidAuctionDepot page", previous=previous)
+                        self.read_network_log(self.driver, "BidAuctionDepot")
                         self.ui['status'].info(f"Navigating to page {page}")
                     else:
                         self.ui['status'].success("No more pages to scrape.")
+                        self.end_crawl(f"page {page}: no next-page button")
                         break
                 except Exception as e:
                     self.ui['status'].warning("Error during pagination, stopping scraper.")